@@ -1,4 +1,33 @@
-from .widget import *
-from .app import *
-from .window import *
-from .utils import *
\ No newline at end of file
+import importlib
+
+# submodules are imported on first access to their attributes, so heavy widgets (ImageLayout with NumPy,
+# OpenGLWidget with QtOpenGL) don't slow down applications, that don't use them
+_attributes_modules = {
+    'widget': ['Checkable', 'Widget', 'LabeledWidget', 'ValueContains', 'LineEdit', 'Button', 'CheckBox',
+               'RadioButton', 'ComboBox', 'ProgressBar', 'PathDialog', 'OpenFile', 'SaveFile', 'OpenDirectory',
+               'ListWidget', 'DynamicView'],
+    'image_layout': ['ImageLayout'],
+    'table': ['Table'],
+    'opengl': ['OpenGLWidget'],
+    'app': ['AsyncioLoop', 'get_asyncio_loop', 'wrap_callback', 'is_ui_thread', 'call_soon_ui', 'ui_thread', 'TaskPool',
+            'get_task_pool', 'submit', 'Application'],
+    'window': ['WindowPool', 'AbstractWindow', 'Window', 'ModalWindow', 'MainWindow', 'DockWidget', 'MessageWindow', 'DialogWindow',
+               'ProgressToken', 'TaskRunner', 'ProgressWindow', 'DoubleProgressWindow'],
+    'utils': ['StateSaver', 'ProgressBoard'],
+}
+_attributes = {name: module for module, names in _attributes_modules.items() for name in names}
+
+__all__ = list(_attributes.keys())
+
+
+def __getattr__(name):
+    if name not in _attributes:
+        raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+    value = getattr(importlib.import_module('.' + _attributes[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + __all__)
@@ -1,14 +1,461 @@
+import asyncio
+import functools
+import inspect
+import os
+import selectors
 import sys
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
+from PySide2.QtCore import QObject, Signal, QTimer, QThread, QCoreApplication, Qt, QSocketNotifier
 from PySide2.QtWidgets import *
 
 
+class _NotifierSelector(selectors.DefaultSelector):
+    """
+    Selector, that watches registered file descriptors by Qt socket notifiers and wakes asyncio loop up when any of
+    them is ready, so Qt event loop doesn't need to poll it
+    """
+
+    def __init__(self, wakeup: callable):
+        super().__init__()
+        self.__wakeup = wakeup
+        self.__notifiers = {}
+
+    def register(self, fileobj, events, data=None):
+        key = super().register(fileobj, events, data)
+        self.__update_notifiers(key.fd, events)
+        return key
+
+    def modify(self, fileobj, events, data=None):
+        key = super().modify(fileobj, events, data)
+        self.__update_notifiers(key.fd, events)
+        return key
+
+    def unregister(self, fileobj):
+        key = super().unregister(fileobj)
+        self.__update_notifiers(key.fd, 0)
+        return key
+
+    def close(self):
+        for notifier in self.__notifiers.values():
+            notifier.setEnabled(False)
+        self.__notifiers.clear()
+        super().close()
+
+    def __update_notifiers(self, fd, events):
+        for event, notifier_type in ((selectors.EVENT_READ, QSocketNotifier.Read),
+                                     (selectors.EVENT_WRITE, QSocketNotifier.Write)):
+            notifier = self.__notifiers.pop((fd, event), None)
+            if notifier is not None:
+                notifier.setEnabled(False)
+                notifier.deleteLater()
+            if events & event:
+                notifier = QSocketNotifier(fd, notifier_type)
+                notifier.activated.connect(lambda *args: self.__wakeup())
+                self.__notifiers[(fd, event)] = notifier
+
+
+def _noop():
+    pass
+
+
+# nested iterations use internals of asyncio, that are checked for Python 3.7 - 3.13. With other versions coroutines
+# wait until nested Qt event loop is finished
+_IS_NESTED_RUN_SUPPORTED = (3, 7) <= sys.version_info[:2] <= (3, 13) and hasattr(asyncio.BaseEventLoop, '_run_once') \
+    and hasattr(asyncio.tasks, '_enter_task') and hasattr(asyncio.tasks, '_leave_task')
+
+
+class AsyncioLoop(asyncio.SelectorEventLoop):
+    """
+    asyncio event loop, that is driven by Qt event loop. Loop iterations are run by Qt timer without blocking, so
+    coroutines are executed in UI thread together with Qt events. I/O readiness wakes loop up through Qt socket
+    notifiers, and loop keeps iterating from nested Qt event loops (e.g. when coroutine shows modal dialog).
+    Iterating from nested Qt event loops relies on asyncio internals and is supported for Python 3.7 - 3.13
+    """
+
+    MAX_TIMER_INTERVAL = 2 ** 31 - 1
+
+    def __init__(self):
+        self.__timer = QTimer()
+        self.__timer.setSingleShot(True)
+        self.__timer.timeout.connect(self.__run_once)
+        super().__init__(_NotifierSelector(self.__wakeup))
+
+    def start(self):
+        """
+        Start driving loop by Qt event loop and set it as current asyncio event loop
+        """
+        asyncio.set_event_loop(self)
+        self.__timer.start(0)
+
+    def call_soon(self, callback, *args, **kwargs):
+        handle = super().call_soon(callback, *args, **kwargs)
+        self.__wakeup()
+        return handle
+
+    def call_at(self, when, callback, *args, **kwargs):
+        # call_later is implemented by call_at. Timer of idle loop must be restarted for new scheduled callback
+        handle = super().call_at(when, callback, *args, **kwargs)
+        self.__wakeup()
+        return handle
+
+    def __wakeup(self):
+        if not self.is_closed():
+            self.__timer.start(0)
+
+    def __run_once(self):
+        if self.is_closed():
+            return
+        if not self.is_running():
+            # call_soon of stop callback makes iteration non-blocking and stops loop after it
+            super().call_soon(self.stop)
+            self.run_forever()
+        elif _IS_NESTED_RUN_SUPPORTED:
+            self.__run_nested()
+
+        interval = self.__get_next_interval()
+        if interval is not None:
+            self.__timer.start(interval)
+
+    def __run_nested(self):
+        # Loop is running, but we got here from nested Qt event loop, that is started by callback of running iteration
+        # (modal dialog opened by coroutine). Blocked task is suspended while other callbacks are run and handles,
+        # that may be still expected by outer iteration, are replaced by no-op ones
+        task = asyncio.current_task(self)
+        if task is not None:
+            asyncio.tasks._leave_task(self, task)
+        pending_num = len(self._ready)
+        try:
+            # no-op handle makes iteration non-blocking
+            self._ready.append(asyncio.Handle(_noop, (), self))
+            self._run_once()
+        finally:
+            self._ready.extendleft(asyncio.Handle(_noop, (), self) for _ in range(pending_num))
+            if task is not None:
+                asyncio.tasks._enter_task(self, task)
+
+    def __get_next_interval(self):
+        if len(self._ready) > 0:
+            return 0
+        if len(self._scheduled) > 0:
+            timeout = (self._scheduled[0].when() - self.time()) * 1000
+            return int(min(max(timeout, 0), self.MAX_TIMER_INTERVAL))
+        # nothing to do until new callback or I/O event
+        return None
+
+
+_asyncio_loop = None
+_callback_tasks = set()
+
+
+def get_asyncio_loop():
+    """
+    Get asyncio event loop, that is driven by Qt event loop. Loop is created on first call. QApplication must exist
+    :return: event loop
+    :rtype: AsyncioLoop
+    """
+    global _asyncio_loop
+    if _asyncio_loop is None:
+        _asyncio_loop = AsyncioLoop()
+        _asyncio_loop.start()
+    return _asyncio_loop
+
+
+def wrap_callback(callback: callable):
+    """
+    Make callback suitable for Qt signals. Coroutine function is wrapped to function, that schedule coroutine in asyncio
+    event loop, that is driven by Qt. Extra arguments of signal are dropped for coroutine function
+    :param callback: function or coroutine function
+    :return: callable for connection to signal
+    """
+    if not inspect.iscoroutinefunction(callback):
+        return callback
+
+    try:
+        params = inspect.signature(callback).parameters.values()
+        if any(p.kind == p.VAR_POSITIONAL for p in params):
+            args_num = None
+        else:
+            args_num = len([p for p in params if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)])
+    except (TypeError, ValueError):
+        args_num = None
+
+    def schedule(*args):
+        task = get_asyncio_loop().create_task(callback(*(args if args_num is None else args[:args_num])))
+        # loop keeps only weak references to tasks
+        _callback_tasks.add(task)
+        task.add_done_callback(_callback_tasks.discard)
+
+    return schedule
+
+
+class _UiDispatcher(QObject):
+    """
+    Queue of calls, that must be executed in UI thread. Queue is drained by one batch per event loop iteration. Calls
+    with the same key are collapsed to one call with the latest arguments, that takes place of the latest call, so
+    order with other calls is kept
+    """
+
+    wakeup = Signal()
+
+    def __init__(self):
+        super().__init__()
+        self.__lock = threading.Lock()
+        self.__calls = deque()
+        self.__collapsed = {}
+        self.__is_wakeup_sent = False
+        self.wakeup.connect(self.__drain, Qt.QueuedConnection)
+
+    def post(self, fn: callable, args: tuple, kwargs: dict, key=None):
+        with self.__lock:
+            if key is not None and key in self.__collapsed:
+                # previous call is dropped in place: removing from the middle of deque isn't needed
+                self.__collapsed[key][0] = None
+
+            call = [fn, args, kwargs]
+            self.__calls.append(call)
+            if key is not None:
+                self.__collapsed[key] = call
+
+            if self.__is_wakeup_sent:
+                return
+            self.__is_wakeup_sent = True
+
+        self.wakeup.emit()
+
+    def __drain(self):
+        with self.__lock:
+            calls, self.__calls = self.__calls, deque()
+            self.__collapsed = {}
+            self.__is_wakeup_sent = False
+
+        for fn, args, kwargs in calls:
+            if fn is None:
+                continue
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                traceback.print_exc()
+
+
+_ui_dispatcher = None
+_ui_dispatcher_lock = threading.Lock()
+
+
+def is_ui_thread():
+    """
+    Check is current thread is UI thread. If QApplication isn't created, every thread is UI thread
+    :return: True if current thread is UI thread
+    """
+    app = QCoreApplication.instance()
+    return app is None or QThread.currentThread() == app.thread()
+
+
+def call_soon_ui(fn: callable, *args, key=None, **kwargs):
+    """
+    Queue function call to UI thread. Function is called directly, if current thread is UI thread
+    :param fn: function
+    :param args: function arguments
+    :param key: key for collapsing calls: from calls with the same key, that are queued during one event loop iteration,
+    only one is executed with the latest arguments
+    :param kwargs: function keyword arguments
+    """
+    if is_ui_thread():
+        fn(*args, **kwargs)
+        return
+
+    global _ui_dispatcher
+    with _ui_dispatcher_lock:
+        if _ui_dispatcher is None:
+            _ui_dispatcher = _UiDispatcher()
+            _ui_dispatcher.moveToThread(QCoreApplication.instance().thread())
+    _ui_dispatcher.post(fn, args, kwargs, key)
+
+
+def ui_thread(collapse: bool = False):
+    """
+    Decorator of methods, that must be called in UI thread. Call from another thread is queued to UI thread and returns
+    None
+    :param collapse: is need to collapse queued calls of method for the same object to one call with the latest
+    arguments
+    """
+    def decorator(fn: callable):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if is_ui_thread():
+                return fn(*args, **kwargs)
+            key = (id(args[0]) if len(args) > 0 else None, fn.__qualname__) if collapse else None
+            call_soon_ui(fn, *args, key=key, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TaskPool:
+    """
+    Shared pools of thread and process workers. Tasks results are delivered to callbacks in UI thread
+    """
+
+    EXECUTORS = ['thread', 'process']
+
+    def __init__(self, threads_num: int = None, processes_num: int = None, max_queued_tasks: int = 1000):
+        """
+        :param threads_num: number of threads workers. By default depends on number of CPUs
+        :param processes_num: number of processes workers. By default equal to number of CPUs
+        :param max_queued_tasks: maximum number of tasks, that wait for free worker in every pool
+        """
+        cpus_num = os.cpu_count() or 1
+        self.__workers_num = {'thread': threads_num or min(32, cpus_num + 4), 'process': processes_num or cpus_num}
+        self.__max_queued_tasks = max_queued_tasks
+        self.__executors = {}
+        self.__lock = threading.Lock()
+        self.__stats = {e: {'pending': 0, 'completed': 0, 'failed': 0, 'latency_sum': 0.} for e in self.EXECUTORS}
+
+    def submit(self, fn: callable, *args, on_done: callable = None, on_error: callable = None, executor: str = 'thread',
+               disable=None, **kwargs):
+        """
+        Run function in worker
+        :param fn: function. For process executor function and arguments must be picklable
+        :param args: function arguments
+        :param on_done: callback on_done(result), that called in UI thread after function finished
+        :param on_error: callback on_error(exception), that called in UI thread if function raise exception. If isn't
+        specified, exception traceback is printed
+        :param executor: type of executor: 'thread' or 'process'
+        :param disable: widget (or list of widgets), that disabled while task is running
+        :param kwargs: function keyword arguments
+        :return: future of task
+        :rtype: concurrent.futures.Future
+        """
+        if executor not in self.EXECUTORS:
+            raise Exception("Incorrect executor parameter value: '{}'. Must be one of {}".format(executor, self.EXECUTORS))
+
+        stats = self.__stats[executor]
+        with self.__lock:
+            if stats['pending'] >= self.__workers_num[executor] + self.__max_queued_tasks:
+                raise Exception("Tasks queue of '{}' executor is full".format(executor))
+            stats['pending'] += 1
+
+        widgets = [] if disable is None else (disable if isinstance(disable, (list, tuple)) else [disable])
+        for w in widgets:
+            w.set_enabled(False)
+
+        submit_time = time.time()
+        try:
+            future = self.__get_executor(executor).submit(fn, *args, **kwargs)
+        except Exception:
+            with self.__lock:
+                stats['pending'] -= 1
+            for w in widgets:
+                w.set_enabled(True)
+            raise
+
+        def on_finished(f):
+            is_failed = not f.cancelled() and f.exception() is not None
+            with self.__lock:
+                stats['pending'] -= 1
+                stats['failed' if is_failed else 'completed'] += 1
+                stats['latency_sum'] += time.time() - submit_time
+            call_soon_ui(self.__deliver, f, widgets, on_done, on_error)
+
+        future.add_done_callback(on_finished)
+        return future
+
+    def get_stats(self):
+        """
+        Get statistics of pools
+        :return: dict with statistics for every executor: number of workers, number of queued and running tasks, number
+        of completed and failed tasks and mean latency of tasks from submit to finish in seconds
+        """
+        res = {}
+        with self.__lock:
+            for executor, stats in self.__stats.items():
+                workers_num = self.__workers_num[executor]
+                finished_num = stats['completed'] + stats['failed']
+                res[executor] = {'workers': workers_num,
+                                 'queued': max(stats['pending'] - workers_num, 0),
+                                 'running': min(stats['pending'], workers_num),
+                                 'completed': stats['completed'],
+                                 'failed': stats['failed'],
+                                 'mean_latency': stats['latency_sum'] / finished_num if finished_num > 0 else None}
+        return res
+
+    def shutdown(self, wait: bool = False):
+        """
+        Shutdown executors. Queued tasks are cancelled
+        :param wait: is need to wait for running tasks
+        """
+        with self.__lock:
+            executors, self.__executors = self.__executors, {}
+        for e in executors.values():
+            e.shutdown(wait=wait, cancel_futures=True)
+
+    def __get_executor(self, executor: str):
+        with self.__lock:
+            if executor not in self.__executors:
+                if executor == 'thread':
+                    self.__executors[executor] = ThreadPoolExecutor(self.__workers_num[executor])
+                else:
+                    self.__executors[executor] = ProcessPoolExecutor(self.__workers_num[executor])
+            return self.__executors[executor]
+
+    @staticmethod
+    def __deliver(future, widgets: [], on_done: callable, on_error: callable):
+        for w in widgets:
+            w.set_enabled(True)
+
+        if future.cancelled():
+            return
+        exception = future.exception()
+        if exception is None:
+            if on_done is not None:
+                on_done(future.result())
+        elif on_error is not None:
+            on_error(exception)
+        else:
+            traceback.print_exception(type(exception), exception, exception.__traceback__)
+
+
+_task_pool = None
+
+
+def get_task_pool():
+    """
+    Get shared pool of workers. Pool with default parameters is created on first call, if Application doesn't create it
+    :return: pool
+    :rtype: TaskPool
+    """
+    global _task_pool
+    if _task_pool is None:
+        _task_pool = TaskPool()
+    return _task_pool
+
+
+def submit(fn: callable, *args, on_done: callable = None, on_error: callable = None, executor: str = 'thread',
+           disable=None, **kwargs):
+    """
+    Run function in shared pool of workers. See TaskPool.submit
+    """
+    return get_task_pool().submit(fn, *args, on_done=on_done, on_error=on_error, executor=executor, disable=disable,
+                                  **kwargs)
+
+
 class Application:
     """
     Class, that provide system information and interaction
     """
-    def __init__(self):
+    def __init__(self, threads_num: int = None, processes_num: int = None, max_queued_tasks: int = 1000):
+        """
+        :param threads_num: number of threads in shared workers pool. See TaskPool
+        :param processes_num: number of processes in shared workers pool
+        :param max_queued_tasks: maximum number of tasks, that wait for free worker
+        """
+        global _task_pool
         self.__app = QApplication(sys.argv)
+        _task_pool = TaskPool(threads_num, processes_num, max_queued_tasks)
+        self.__app.aboutToQuit.connect(_task_pool.shutdown)
 
     def run(self):
         """
@@ -17,6 +464,48 @@ class Application:
         """
         return self.__app.exec_()
 
+    def run_async(self, main_coro=None):
+        """
+        Run application with asyncio event loop, that is driven by Qt event loop. Coroutines may be used as widgets
+        callbacks and all of them are executed in UI thread
+        :param main_coro: main coroutine. Application is finished, when it's done
+        :return: result of main coroutine or application exit code if main coroutine isn't specified
+        """
+        loop = get_asyncio_loop()
+        if main_coro is None:
+            return self.run()
+
+        task = loop.create_task(main_coro)
+        task.add_done_callback(lambda t: self.__app.quit())
+        code = self.run()
+        if not task.done():
+            task.cancel()
+            return code
+        return task.result()
+
+    @staticmethod
+    def call_soon_ui(fn: callable, *args, key=None, **kwargs):
+        """
+        Queue function call to UI thread. See call_soon_ui
+        """
+        call_soon_ui(fn, *args, key=key, **kwargs)
+
+    @staticmethod
+    def submit(fn: callable, *args, on_done: callable = None, on_error: callable = None, executor: str = 'thread',
+               disable=None, **kwargs):
+        """
+        Run function in shared pool of workers and deliver result to callbacks in UI thread. See TaskPool.submit
+        :return: future of task
+        """
+        return submit(fn, *args, on_done=on_done, on_error=on_error, executor=executor, disable=disable, **kwargs)
+
+    @staticmethod
+    def get_tasks_stats():
+        """
+        Get statistics of shared pool of workers. See TaskPool.get_stats
+        """
+        return get_task_pool().get_stats()
+
     def screen_resolution(self):
         """
         Get current screen size
@@ -0,0 +1,1168 @@
+import math
+import os
+import sys
+import threading
+import time
+import traceback
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from PySide2.QtWidgets import QGraphicsView, QGraphicsScene, QGraphicsItem, QStyleOptionGraphicsItem
+from PySide2.QtGui import QPixmap, QImage, QImageReader, QPainterPath, QGuiApplication, QPen, QColor, QPolygonF, \
+    QPainter
+from PySide2.QtCore import QObject, Signal, Qt, QRectF, QTimer, QSize, QSizeF, QPointF
+
+from .widget import Widget
+from .app import wrap_callback, call_soon_ui
+
+
+class ImageLayout(Widget):
+    class ImageItem(QGraphicsItem):
+        """ Graphics item, that paints QImage directly, without conversion to QPixmap.
+        Keeps reference to object, that owns image buffer, while image is shown.
+        """
+
+        def __init__(self, parent=None):
+            QGraphicsItem.__init__(self, parent)
+            self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+            self._image = None
+            self._data = None
+            self._size = (0, 0)
+
+        def setImage(self, image, data=None, size: tuple = None):
+            """ Set image to paint.
+            :type image: QImage
+            :param data: owner of image buffer (for example NumPy array)
+            :param size: size (width, height) of item. Image is stretched to this size. Image size by default
+            """
+            size = (image.width(), image.height()) if size is None else tuple(size)
+            if size != self._size:
+                self.prepareGeometryChange()
+            self._image, self._data, self._size = image, data, size
+            self.update()
+
+        def image(self):
+            return self._image
+
+        def boundingRect(self):
+            return QRectF(0, 0, self._size[0], self._size[1])
+
+        def paint(self, painter, option, widget=None):
+            if self._image is None or self._size[0] < 1 or self._size[1] < 1:
+                return
+            exposed = option.exposedRect.intersected(self.boundingRect())
+            scale_x, scale_y = self._image.width() / self._size[0], self._image.height() / self._size[1]
+            source = QRectF(exposed.x() * scale_x, exposed.y() * scale_y, exposed.width() * scale_x,
+                            exposed.height() * scale_y)
+            painter.drawImage(exposed, self._image, source)
+
+    class TiledImageItem(QGraphicsItem):
+        """ Graphics item for huge images, that split to tiles on several levels of detail.
+        Only tiles, that intersect exposed area on the level for current zoom are decoded and uploaded to QPixmap.
+        Uploaded tiles are kept in memory-bounded LRU cache.
+        Tiles source may be:
+            NumPy array, including np.memmap over raw file (see ImageLayout.open_raw). Levels are sampled with stride
+            callable source(x, y, width, height, step), that return array of region in full resolution coordinates,
+            sampled with step (shape is (ceil(height / step), ceil(width / step)[, channels]))
+        """
+
+        def __init__(self, source, size: tuple = None, tile_size: int = 256, cache_size: int = 256 * 2 ** 20,
+                     is_bgr: bool = False, parent=None):
+            QGraphicsItem.__init__(self, parent)
+            self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+            self._source = source
+            if size is None:
+                if callable(source):
+                    raise Exception("Image size doesn't specified for callable tiles source")
+                size = (source.shape[1], source.shape[0])
+            self._width, self._height = size
+            self._tile_size = tile_size
+            self._cache_size = cache_size
+            self._is_bgr = is_bgr
+            self._max_level = max(0, int(math.ceil(math.log2(max(self._width, self._height) / tile_size))))
+
+            self._tiles = OrderedDict()
+            self._cached_size = 0
+
+        def boundingRect(self):
+            return QRectF(0, 0, self._width, self._height)
+
+        def paint(self, painter, option, widget=None):
+            exposed = option.exposedRect.intersected(self.boundingRect())
+            if exposed.isEmpty():
+                return
+
+            lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+            level = 0 if lod >= 1 or lod <= 0 else min(int(math.floor(math.log2(1 / lod))), self._max_level)
+            step = 2 ** level
+            tile_extent = self._tile_size * step
+
+            for ty in range(int(exposed.top() // tile_extent), int(math.ceil(exposed.bottom() / tile_extent))):
+                for tx in range(int(exposed.left() // tile_extent), int(math.ceil(exposed.right() / tile_extent))):
+                    x, y = tx * tile_extent, ty * tile_extent
+                    width, height = min(tile_extent, self._width - x), min(tile_extent, self._height - y)
+                    pixmap = self.__get_tile(level, tx, ty, x, y, width, height, step)
+                    painter.drawPixmap(QRectF(x, y, width, height), pixmap, QRectF(pixmap.rect()))
+
+        def clearCache(self):
+            self._tiles.clear()
+            self._cached_size = 0
+
+        def __get_tile(self, level: int, tx: int, ty: int, x: int, y: int, width: int, height: int, step: int):
+            key = (level, tx, ty)
+            pixmap = self._tiles.get(key)
+            if pixmap is not None:
+                self._tiles.move_to_end(key)
+                return pixmap
+
+            if callable(self._source):
+                data = self._source(x, y, width, height, step)
+            else:
+                data = self._source[y: y + height: step, x: x + width: step]
+            # tile is copied anyway, so non-native byte order (for example 16-bit PNM) is converted by the same copy
+            data = np.asarray(data)
+            image, data = ImageLayout.array_to_qimage(
+                np.ascontiguousarray(data, dtype=data.dtype.newbyteorder('=')), self._is_bgr)
+            pixmap = QPixmap.fromImage(image)
+
+            self._tiles[key] = pixmap
+            self._cached_size += pixmap.width() * pixmap.height() * 4
+            while self._cached_size > self._cache_size and len(self._tiles) > 1:
+                _, evicted = self._tiles.popitem(last=False)
+                self._cached_size -= evicted.width() * evicted.height() * 4
+            return pixmap
+
+    class OverlayItem(QGraphicsItem):
+        """ Graphics item, that paints group of annotation shapes with one style: boxes, polygons and keypoints.
+        Shapes are stored as NumPy arrays and culled by exposed area in vectorized way, so thousands of shapes don't
+        need thousands of graphics items. Boxes hit-testing uses index of boxes, sorted by left side.
+        """
+
+        def __init__(self, color=(255, 0, 0), width: int = 1, parent=None):
+            QGraphicsItem.__init__(self, parent)
+            self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption)
+            self.setZValue(1)
+
+            self._pen, self._points_pen = None, None
+            self.setStyle(color, width)
+
+            self._boxes = np.empty((0, 4))
+            self._polygons, self._polygons_bounds = [], np.empty((0, 4))
+            self._keypoints = np.empty((0, 2))
+            self._labels = None
+            self._rect = QRectF()
+            self._polygons_path = None
+            self._boxes_index = None
+
+        def setStyle(self, color=(255, 0, 0), width: int = 1):
+            """ Set style of all shapes of item.
+            :param color: color of shapes: (r, g, b[, a]) or color name
+            :param width: width of lines in pixels
+            """
+            self._pen = QPen(QColor(*color) if isinstance(color, (tuple, list)) else QColor(color), width)
+            self._pen.setCosmetic(True)
+            self._points_pen = QPen(self._pen)
+            self._points_pen.setWidth(max(3, width * 3))
+            self.update()
+
+        def setShapes(self, boxes=None, polygons=None, keypoints=None, labels=None):
+            """ Replace shapes of item.
+            :param boxes: array with shape (N, 4) of boxes [x0, y0, x1, y1] in image coordinates
+            :param polygons: list of arrays with shape (K, 2) of polygons vertices
+            :param keypoints: array with shape (M, 2) of points
+            :param labels: list of N labels for boxes
+            """
+            self.prepareGeometryChange()
+            self._boxes = np.empty((0, 4)) if boxes is None else np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+            self._polygons = [] if polygons is None else [np.asarray(p, dtype=np.float64) for p in polygons]
+            self._polygons_bounds = np.array([[p[:, 0].min(), p[:, 1].min(), p[:, 0].max(), p[:, 1].max()]
+                                              for p in self._polygons]).reshape(-1, 4)
+            self._keypoints = np.empty((0, 2)) if keypoints is None else np.asarray(keypoints, dtype=np.float64).reshape(-1, 2)
+            self._labels = labels
+            self._polygons_path, self._boxes_index = None, None
+
+            bounds = np.concatenate((self._boxes, self._polygons_bounds, np.hstack((self._keypoints, self._keypoints))))
+            if len(bounds) > 0:
+                x0, y0 = bounds[:, :2].min(axis=0)
+                x1, y1 = bounds[:, 2:].max(axis=0)
+                self._rect = QRectF(x0, y0, x1 - x0, y1 - y0).adjusted(-1, -1, 1, 1)
+            else:
+                self._rect = QRectF()
+            self.update()
+
+        def boundingRect(self):
+            return self._rect
+
+        def hitTest(self, x: float, y: float):
+            """ Find shapes, that contain point.
+            :return: indices of boxes and indices of polygons, that contain point
+            """
+            if self._boxes_index is None:
+                order = np.argsort(self._boxes[:, 0], kind='stable')
+                max_width = (self._boxes[:, 2] - self._boxes[:, 0]).max() if len(self._boxes) > 0 else 0
+                self._boxes_index = (order, self._boxes[order, 0], max_width)
+
+            order, left_sides, max_width = self._boxes_index
+            candidates = order[np.searchsorted(left_sides, x - max_width, 'left'): np.searchsorted(left_sides, x, 'right')]
+            boxes = self._boxes[candidates]
+            boxes_idx = np.sort(candidates[(boxes[:, 2] >= x) & (boxes[:, 1] <= y) & (boxes[:, 3] >= y)])
+
+            bounds = self._polygons_bounds
+            candidates = np.flatnonzero((bounds[:, 0] <= x) & (bounds[:, 2] >= x) & (bounds[:, 1] <= y) & (bounds[:, 3] >= y))
+            polygons_idx = [int(i) for i in candidates
+                            if self.__to_polygon(self._polygons[i]).containsPoint(QPointF(x, y), Qt.OddEvenFill)]
+            return boxes_idx, polygons_idx
+
+        def paint(self, painter, option, widget=None):
+            exposed = option.exposedRect
+            left, top, right, bottom = exposed.left(), exposed.top(), exposed.right(), exposed.bottom()
+            painter.setPen(self._pen)
+            painter.setBrush(Qt.NoBrush)
+
+            boxes = self._boxes
+            visible = np.flatnonzero((boxes[:, 2] >= left) & (boxes[:, 0] <= right) & (boxes[:, 3] >= top) &
+                                     (boxes[:, 1] <= bottom))
+            if len(visible) > 0:
+                painter.drawRects([QRectF(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes[visible].tolist()])
+
+            if len(self._polygons) > 0:
+                if self._polygons_path is None:
+                    self._polygons_path = QPainterPath()
+                    for p in self._polygons:
+                        self._polygons_path.addPolygon(self.__to_polygon(p))
+                        self._polygons_path.closeSubpath()
+                painter.drawPath(self._polygons_path)
+
+            points = self._keypoints
+            points = points[(points[:, 0] >= left) & (points[:, 0] <= right) & (points[:, 1] >= top) &
+                            (points[:, 1] <= bottom)]
+            if len(points) > 0:
+                painter.setPen(self._points_pen)
+                painter.drawPoints(self.__to_polygon(points))
+                painter.setPen(self._pen)
+
+            if self._labels is not None and 0 < len(visible) <= 1000:
+                transform = painter.worldTransform()
+                painter.resetTransform()
+                for idx in visible.tolist():
+                    painter.drawText(transform.map(QPointF(boxes[idx, 0], boxes[idx, 1])) + QPointF(2, -2),
+                                     str(self._labels[idx]))
+                painter.setWorldTransform(transform)
+
+        @staticmethod
+        def __to_polygon(points):
+            return QPolygonF([QPointF(x, y) for x, y in points.tolist()])
+
+    class QtImageViewer(QGraphicsView):
+        """ PyQt image viewer widget for a QPixmap in a QGraphicsView scene with mouse zooming and panning.
+        Displays a QImage or QPixmap (QImage is internally converted to a QPixmap).
+        To display any other image format, you must first convert it to a QImage or QPixmap.
+        Some useful image format conversion utilities:
+            qimage2ndarray: NumPy ndarray <==> QImage    (https://github.com/hmeine/qimage2ndarray)
+            ImageQt: PIL Image <==> QImage  (https://github.com/python-pillow/Pillow/blob/master/PIL/ImageQt.py)
+        Mouse interaction:
+            Left mouse button drag: Pan image.
+            Right mouse button drag: Zoom box.
+            Right mouse button doubleclick: Zoom to show entire image.
+        """
+
+        # Mouse button signals emit image scene (x, y) coordinates.
+        # !!! For image (row, column) matrix indexing, row = y and column = x.
+        leftMouseButtonPressed = Signal(float, float)
+        rightMouseButtonPressed = Signal(float, float)
+        leftMouseButtonReleased = Signal(float, float)
+        rightMouseButtonReleased = Signal(float, float)
+        leftMouseButtonDoubleClicked = Signal(float, float)
+        rightMouseButtonDoubleClicked = Signal(float, float)
+
+        def __init__(self):
+            QGraphicsView.__init__(self)
+
+            # Image is displayed as a QPixmap in a QGraphicsScene attached to this QGraphicsView.
+            self.scene = QGraphicsScene()
+            self.setScene(self.scene)
+
+            # Store a local handle to the scene's current image pixmap.
+            self._pixmapHandle = None
+
+            # Store a local handle to the scene's current image item, that paints QImage without QPixmap conversion.
+            self._imageHandle = None
+
+            # Store a local handle to the scene's current tiled image item.
+            self._tilesHandle = None
+
+            # Image aspect ratio mode.
+            # !!! ONLY applies to full image. Aspect ratio is always ignored when zooming.
+            #   Qt.IgnoreAspectRatio: Scale image to fit viewport.
+            #   Qt.KeepAspectRatio: Scale image to fit inside viewport, preserving aspect ratio.
+            #   Qt.KeepAspectRatioByExpanding: Scale image to fill the viewport, preserving aspect ratio.
+            self.aspectRatioMode = Qt.KeepAspectRatio
+
+            # Scroll bar behaviour.
+            #   Qt.ScrollBarAlwaysOff: Never shows a scroll bar.
+            #   Qt.ScrollBarAlwaysOn: Always shows a scroll bar.
+            #   Qt.ScrollBarAsNeeded: Shows a scroll bar only when zoomed.
+            self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+            self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
+
+            self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+
+            # Stack of QRectF zoom boxes in scene coordinates.
+            self.zoomStack = []
+
+            # Flags for enabling/disabling mouse interaction.
+            self.canZoom = True
+            self.canPan = True
+
+            # Interactive rendering: fast transformations during wheel, pan and resize bursts.
+            # Input is coalesced to one transformation per frame, smooth render follows after idle delay.
+            self.isInteractiveRendering = False
+            self.idleDelay = 150
+            self._isFastRendering = False
+            self._pendingZoomSteps = 0
+            self._isResizePending = False
+            self._frameTimer = QTimer(self)
+            self._frameTimer.setSingleShot(True)
+            self._frameTimer.setInterval(16)
+            self._frameTimer.timeout.connect(self._applyPendingInput)
+            self._idleTimer = QTimer(self)
+            self._idleTimer.setSingleShot(True)
+            self._idleTimer.timeout.connect(self._endInteraction)
+
+        def setInteractiveRendering(self, isEnabled=True, idleDelay=150):
+            """ Enable or disable interactive rendering.
+            While wheel, pan or resize events are coming, image is rendered with fast transformations (nearest
+            neighbor, no antialiasing) and wheel and resize events are applied once per frame.
+            Smooth render is done after input is idle for idleDelay milliseconds.
+            """
+            self.isInteractiveRendering = isEnabled
+            self.idleDelay = idleDelay
+            self._setSmoothRendering(isEnabled)
+
+        def _setSmoothRendering(self, isSmooth):
+            self.setRenderHint(QPainter.SmoothPixmapTransform, isSmooth)
+            self.setRenderHint(QPainter.Antialiasing, isSmooth)
+
+        def _beginInteraction(self):
+            """ Switch to fast rendering until input is idle.
+            """
+            if not self._isFastRendering:
+                self._isFastRendering = True
+                self._setSmoothRendering(False)
+            self._idleTimer.start(self.idleDelay)
+
+        def _endInteraction(self):
+            self._isFastRendering = False
+            self._setSmoothRendering(True)
+            self.viewport().update()
+
+        def _applyPendingInput(self):
+            """ Apply input, that was coalesced during frame.
+            """
+            if self._pendingZoomSteps != 0:
+                scale_factor = 1.1 ** self._pendingZoomSteps
+                self._pendingZoomSteps = 0
+                self.scale(scale_factor, scale_factor)
+            if self._isResizePending:
+                self._isResizePending = False
+                self.updateViewer()
+
+        def hasImage(self):
+            """ Returns whether or not the scene contains an image pixmap.
+            """
+            return self._pixmapHandle is not None or self._imageHandle is not None or self._tilesHandle is not None
+
+        def clearImage(self):
+            """ Removes the current image pixmap from the scene if it exists.
+            """
+            self._removeHandles('_pixmapHandle', '_imageHandle', '_tilesHandle')
+
+        def _removeHandles(self, *names):
+            """ Removes items of specified handles from the scene.
+            """
+            for name in names:
+                if getattr(self, name) is not None:
+                    self.scene.removeItem(getattr(self, name))
+                    setattr(self, name, None)
+
+        def pixmap(self):
+            """ Returns the scene's current image pixmap as a QPixmap, or else None if no image exists.
+            :rtype: QPixmap | None
+            """
+            if self._pixmapHandle is not None:
+                return self._pixmapHandle.pixmap()
+            if self._imageHandle is not None:
+                return QPixmap.fromImage(self._imageHandle.image())
+            return None
+
+        def image(self):
+            """ Returns the scene's current image pixmap as a QImage, or else None if no image exists.
+            :rtype: QImage | None
+            """
+            if self._pixmapHandle is not None:
+                return self._pixmapHandle.pixmap().toImage()
+            if self._imageHandle is not None:
+                return self._imageHandle.image()
+            return None
+
+        def setImage(self, image):
+            """ Set the scene's current image pixmap to the input QImage or QPixmap.
+            Raises a RuntimeError if the input image has type other than QImage or QPixmap.
+            :type image: QImage | QPixmap
+            """
+            if type(image) is QPixmap:
+                pixmap = image
+            elif type(image) is QImage:
+                pixmap = QPixmap.fromImage(image)
+            else:
+                raise RuntimeError("ImageViewer.setImage: Argument must be a QImage or QPixmap.")
+            self._removeHandles('_imageHandle', '_tilesHandle')
+            if self.hasImage():
+                self._pixmapHandle.setPixmap(pixmap)
+            else:
+                self._pixmapHandle = self.scene.addPixmap(pixmap)
+            self.setSceneRect(QRectF(pixmap.rect()))  # Set scene size to image size.
+            self.updateViewer()
+
+        def setImageNoCopy(self, image, data=None, size=None):
+            """ Set the scene's current image to the input QImage without conversion to QPixmap.
+            QImage, that wraps external buffer is painted directly from this buffer.
+            :type image: QImage
+            :param data: owner of image buffer. It is kept alive while image is shown
+            :param size: size (width, height) of image in scene. Image is stretched to this size (used for previews)
+            """
+            self._removeHandles('_pixmapHandle', '_tilesHandle')
+            if self._imageHandle is None:
+                self._imageHandle = ImageLayout.ImageItem()
+                self.scene.addItem(self._imageHandle)
+            self._imageHandle.setImage(image, data, size)
+            self.setSceneRect(self._imageHandle.boundingRect())  # Set scene size to image size.
+            self.updateViewer()
+
+        def setFrame(self, image, data=None, size=None):
+            """ Replace current image by next frame of the same stream.
+            If frame size isn't changed, current zoom and pan are kept.
+            :type image: QImage
+            :param data: owner of image buffer. It is kept alive while image is shown
+            :param size: size (width, height) of image in scene. Image size by default
+            """
+            size = (image.width(), image.height()) if size is None else tuple(size)
+            if self._imageHandle is not None and self._imageHandle.boundingRect().size() == QSizeF(*size):
+                self._imageHandle.setImage(image, data, size)
+            else:
+                self.setImageNoCopy(image, data, size)
+
+        def setTiledImage(self, item):
+            """ Set the scene's current image to tiled image item.
+            :type item: ImageLayout.TiledImageItem
+            """
+            self.clearImage()
+            self._tilesHandle = item
+            self.scene.addItem(item)
+            self.setSceneRect(item.boundingRect())  # Set scene size to image size.
+            self.updateViewer()
+
+        def loadImageFromFile(self, fileName):
+            """ Load an image from file.
+            Without any arguments, loadImageFromFile() will popup a file dialog to choose the image file.
+            With a fileName argument, loadImageFromFile(fileName) will attempt to load the specified image file directly.
+            """
+            if len(fileName) and os.path.isfile(fileName):
+                image = QImage(fileName)
+                self.setImage(image)
+
+        def updateViewer(self):
+            """ Show current zoom (if showing entire image, apply current aspect ratio mode).
+            """
+            if not self.hasImage():
+                return
+            if len(self.zoomStack) and self.sceneRect().contains(self.zoomStack[-1]):
+                self.fitInView(self.zoomStack[-1], Qt.IgnoreAspectRatio)  # Show zoomed rect (ignore aspect ratio).
+            else:
+                self.zoomStack = []  # Clear the zoom stack (in case we got here because of an invalid zoom).
+                self.fitInView(self.sceneRect(), self.aspectRatioMode)  # Show entire image (use current aspect ratio mode).
+
+        def resizeEvent(self, event):
+            """ Maintain current zoom on resize.
+            """
+            if not self.isInteractiveRendering:
+                self.updateViewer()
+                return
+            self._isResizePending = True
+            self._beginInteraction()
+            if not self._frameTimer.isActive():
+                self._frameTimer.start()
+
+        def wheelEvent(self, event):
+            scale_factor = 1.1
+
+            if self.isInteractiveRendering:
+                self._pendingZoomSteps += event.delta() / 120
+                self._beginInteraction()
+                if not self._frameTimer.isActive():
+                    self._frameTimer.start()
+            elif event.delta() > 0:
+                self.scale(scale_factor, scale_factor)
+            else:
+                self.scale(1 / scale_factor, 1 / scale_factor)
+
+        def mousePressEvent(self, event):
+            """ Start mouse pan or zoom mode.
+            """
+            scenePos = self.mapToScene(event.pos())
+            if event.button() == Qt.LeftButton:
+                if self.canPan:
+                    self.setDragMode(QGraphicsView.ScrollHandDrag)
+                self.leftMouseButtonPressed.emit(scenePos.x(), scenePos.y())
+            QGraphicsView.mousePressEvent(self, event)
+
+        def mouseMoveEvent(self, event):
+            """ Render fast while image is panned.
+            """
+            if self.isInteractiveRendering and self.dragMode() == QGraphicsView.ScrollHandDrag and \
+                    event.buttons() & Qt.LeftButton:
+                self._beginInteraction()
+            QGraphicsView.mouseMoveEvent(self, event)
+
+        def mouseReleaseEvent(self, event):
+            """ Stop mouse pan or zoom mode (apply zoom if valid).
+            """
+            QGraphicsView.mouseReleaseEvent(self, event)
+            scenePos = self.mapToScene(event.pos())
+            if event.button() == Qt.LeftButton:
+                self.setDragMode(QGraphicsView.NoDrag)
+                self.leftMouseButtonReleased.emit(scenePos.x(), scenePos.y())
+
+        def mouseDoubleClickEvent(self, event):
+            """ Show entire image.
+            """
+            scenePos = self.mapToScene(event.pos())
+            if event.button() == Qt.LeftButton:
+                self.leftMouseButtonDoubleClicked.emit(scenePos.x(), scenePos.y())
+            elif event.button() == Qt.RightButton:
+                if self.canZoom:
+                    self.zoomStack = []  # Clear zoom stack.
+                    self.updateViewer()
+                self.rightMouseButtonDoubleClicked.emit(scenePos.x(), scenePos.y())
+
+            QGraphicsView.mouseDoubleClickEvent(self, event)
+
+    class DisplayTransform:
+        """
+        Display transform of high bit depth and float images to 8-bit: window/level, gamma and colormap.
+        Transform is applied by precomputed lookup tables: integer images are mapped directly, float images are
+        quantized to LUT resolution first. Results are cached per (image, transform) pair and output buffers of evicted
+        results are reused, so changing of transform parameters doesn't allocate new buffers
+        """
+
+        COLORMAPS = {'gray': [(0, 0, 0), (255, 255, 255)],
+                     'hot': [(0, 0, 0), (230, 0, 0), (255, 210, 0), (255, 255, 255)],
+                     'jet': [(0, 0, 128), (0, 0, 255), (0, 255, 255), (255, 255, 0), (255, 0, 0), (128, 0, 0)],
+                     'viridis': [(68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)],
+                     'inferno': [(0, 0, 4), (87, 16, 110), (188, 55, 84), (249, 142, 9), (252, 255, 164)]}
+        FLOAT_LUT_SIZE = 4096
+
+        def __init__(self, window: float = None, level: float = None, gamma: float = 1.0, colormap: str = None,
+                     cache_size: int = 4):
+            self.__lock = threading.Lock()
+            self.__luts = {}
+            self.__cache = OrderedDict()
+            self.__cache_size = max(cache_size, 2)
+            self.__workspaces = {}
+            self.__params = None
+            self.set_params(window, level, gamma, colormap)
+
+        def set_params(self, window: float = None, level: float = None, gamma: float = 1.0, colormap: str = None):
+            """
+            Set transform parameters
+            :param window: width of values range, that mapped to display range. Range of image values if None
+            :param level: center of values range, that mapped to display range. Center of image values if None
+            :param gamma: gamma correction. Values bigger than 1 brighten midtones
+            :param colormap: name of colormap from DisplayTransform.COLORMAPS. Result is RGBA if set
+            """
+            if colormap is not None and colormap not in self.COLORMAPS:
+                raise Exception("Unknown colormap: '{}'".format(colormap))
+            with self.__lock:
+                self.__params = (window, level, gamma, colormap)
+                self.__luts.clear()
+
+        def get_output_shape(self, array):
+            return array.shape + (4,) if self.__params[3] is not None and array.ndim == 2 else array.shape
+
+        def apply(self, array, out=None):
+            """
+            Apply transform to image
+            :param array: image array with shape (height, width) or (height, width, channels)
+            :param out: uint8 array for result. Result is cached if isn't specified
+            :return: uint8 array with shape (height, width[, channels]) or (height, width, 4) if colormap is set
+            """
+            array = np.asarray(array)
+            if self.__params[3] is not None and array.ndim != 2:
+                raise Exception("Colormap may be applied only to single channel image")
+
+            with self.__lock:
+                if out is not None:
+                    self.__transform(array, out)
+                    return out
+
+                key = (id(array), array.__array_interface__['data'][0], array.shape, array.dtype.str, self.__params)
+                if key in self.__cache:
+                    self.__cache.move_to_end(key)
+                    return self.__cache[key][1]
+
+                buffer = None
+                if len(self.__cache) >= self.__cache_size:
+                    _, (_, buffer) = self.__cache.popitem(last=False)
+                shape = self.get_output_shape(array)
+                if buffer is None or buffer.shape != shape:
+                    buffer = np.empty(shape, dtype=np.uint8)
+                self.__transform(array, buffer)
+                self.__cache[key] = (array, buffer)
+                return buffer
+
+        def __transform(self, array, out):
+            window, level, gamma, colormap = self.__params
+            if window is None or level is None:
+                min_value, max_value = float(np.nanmin(array)), float(np.nanmax(array))
+                window = max_value - min_value if window is None else window
+                level = (max_value + min_value) / 2 if level is None else level
+            low, high = level - window / 2, level + window / 2
+            if high <= low:
+                high = low + 1
+
+            if array.dtype.kind == 'u' and array.itemsize <= 2:
+                lut = self.__get_lut(256 if array.itemsize == 1 else 65536, low, high)
+                np.take(lut, array, axis=0, out=out, mode='clip')
+                return
+
+            lut_size = self.FLOAT_LUT_SIZE
+            lut = self.__get_lut(lut_size, 0, lut_size - 1)
+            values, indices = self.__get_workspace('values', array.shape, np.float32), \
+                self.__get_workspace('indices', array.shape, np.uint16)
+            np.subtract(array, low, out=values, casting='unsafe')
+            np.multiply(values, (lut_size - 1) / (high - low), out=values)
+            np.clip(values, 0, lut_size - 1, out=values)
+            np.copyto(indices, values, casting='unsafe')
+            np.take(lut, indices, axis=0, out=out, mode='clip')
+
+        def __get_lut(self, size: int, low: float, high: float):
+            key = (size, low, high)
+            if key not in self.__luts:
+                if len(self.__luts) > 8:
+                    self.__luts.clear()
+                _, _, gamma, colormap = self.__params
+                values = np.clip((np.arange(size, dtype=np.float64) - low) / (high - low), 0, 1)
+                if gamma != 1:
+                    values **= 1 / gamma
+                lut = np.round(values * 255).astype(np.uint8)
+                self.__luts[key] = lut if colormap is None else self.__get_colormap(colormap)[lut]
+            return self.__luts[key]
+
+        def __get_workspace(self, name: str, shape: tuple, dtype):
+            workspace = self.__workspaces.get(name)
+            if workspace is None or workspace.shape != shape:
+                workspace = np.empty(shape, dtype=dtype)
+                self.__workspaces[name] = workspace
+            return workspace
+
+        @classmethod
+        def __get_colormap(cls, name: str):
+            anchors = np.array(cls.COLORMAPS[name], dtype=np.float64)
+            positions = np.linspace(0, 1, len(anchors))
+            table = np.full((256, 4), 255, dtype=np.uint8)
+            for c in range(3):
+                table[:, c] = np.round(np.interp(np.linspace(0, 1, 256), positions, anchors[:, c]))
+            return table
+
+    class Instance(QObject):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+
+        frame_ready = Signal()
+        image_loaded = Signal(int, object, object, object)
+
+    __decode_pool = None
+
+    def __init__(self):
+        super().__init__(self.QtImageViewer())
+        self._layout.addWidget(self._instance)
+
+        self.__instance = self.Instance()
+        self.__instance.frame_ready.connect(self.__on_frame_ready)
+        self.__instance.image_loaded.connect(self.__on_image_loaded)
+        self.__load_id = 0
+        self.__load_future = None
+
+        self.__display_transform = None
+        # transform for images, that can't be shown without it (float for example). It doesn't affect uint8 and uint16
+        # images, unlike transform from set_display_transform
+        self.__implicit_transform = None
+        self.__shown_array = None
+        self.__frame_buffer = None
+
+        self.__overlays = {}
+        self.__overlay_clicked_callbacks = []
+        self._instance.leftMouseButtonPressed.connect(self.__on_overlay_clicked)
+        self.__frames_condition = threading.Condition()
+        self.__frames_thread = None
+        self.__frames_stop = threading.Event()
+        self.__pending_frame, self.__ready_frame = None, None
+        self.__is_display_scheduled = False
+        self.__last_display_time = 0
+        self.__frames_stats = {'received': 0, 'dropped': 0, 'displayed': 0}
+
+    def set_image_from_data(self, image, width, height, bytes_per_line):
+        self.__shown_array = None
+        img = QImage(image, width, height, bytes_per_line, QImage.Format_RGB888)
+        pixmap = QPixmap.fromImage(img)
+        self._instance.setImage(pixmap)
+        return self
+
+    def set_image_from_array(self, array, is_bgr: bool = False):
+        """
+        Show NumPy array without copying. Array is wrapped to QImage through buffer protocol and is kept alive while
+        it is shown, so it mustn't be changed in place after this call
+        :param array: uint8 or uint16 array with shape (height, width) for grayscale or (height, width, channels) with
+        3 (RGB) or 4 (RGBA) channels. Rows may be strided, but pixels in row must be contiguous
+        :param is_bgr: is channels are in BGR(A) order
+        :return: self instance
+        """
+        self.__shown_array = (array, is_bgr)
+        image, data = self.array_to_qimage(*self.__apply_display_transform(array, is_bgr))
+        self._instance.setImageNoCopy(image, data)
+        return self
+
+    def set_display_transform(self, window: float = None, level: float = None, gamma: float = 1.0,
+                              colormap: str = None):
+        """
+        Set display transform for images from set_image_from_array and push_frame. Transform is required to show
+        float images and may be used for 16-bit images. Image, that is shown by set_image_from_array, is re-rendered
+        with current zoom
+        :param window: width of values range, that mapped to display range. Range of image values if None
+        :param level: center of values range, that mapped to display range. Center of image values if None
+        :param gamma: gamma correction. Values bigger than 1 brighten midtones
+        :param colormap: name of colormap from ImageLayout.DisplayTransform.COLORMAPS
+        :return: self instance
+        """
+        if self.__display_transform is None:
+            self.__display_transform = self.DisplayTransform(window, level, gamma, colormap)
+        else:
+            self.__display_transform.set_params(window, level, gamma, colormap)
+        self.__rerender_shown_array()
+        return self
+
+    def reset_display_transform(self):
+        self.__display_transform = None
+        self.__rerender_shown_array()
+        return self
+
+    def __get_display_transform(self, array):
+        if self.__display_transform is not None:
+            return self.__display_transform
+        if array.dtype in (np.uint8, np.uint16):
+            return None
+        if self.__implicit_transform is None:
+            self.__implicit_transform = self.DisplayTransform()
+        return self.__implicit_transform
+
+    def __rerender_shown_array(self):
+        if self.__shown_array is None:
+            return
+        image, data = self.array_to_qimage(*self.__apply_display_transform(*self.__shown_array))
+        self._instance.setFrame(image, data)
+
+    def __apply_display_transform(self, array, is_bgr: bool, out=None):
+        array = np.asarray(array)
+        transform = self.__get_display_transform(array)
+        if transform is None:
+            return array, is_bgr
+        result = transform.apply(array, out)
+        return result, is_bgr and result.ndim == array.ndim
+
+    def set_tiled_image(self, source, size: tuple = None, tile_size: int = 256, cache_size_mb: int = 256,
+                        is_bgr: bool = False):
+        """
+        Show huge image by tiles. Only tiles, that are visible on current zoom are decoded, so whole image is never
+        loaded to memory
+        :param source: NumPy array (for example np.memmap from open_raw) or callable source(x, y, width, height, step),
+        that return array of image region, sampled with step
+        :param size: image size (width, height). Required for callable source
+        :param tile_size: size of tile side in pixels
+        :param cache_size_mb: maximum size of decoded tiles cache in megabytes
+        :param is_bgr: is channels are in BGR(A) order
+        :return: self instance
+        """
+        self.__shown_array = None
+        self._instance.setTiledImage(self.TiledImageItem(source, size, tile_size, cache_size_mb * 2 ** 20, is_bgr))
+        return self
+
+    @staticmethod
+    def open_raw(path: str, width: int, height: int, dtype=np.uint8, channels: int = 1, offset: int = 0):
+        """
+        Open raw uncompressed image file as read-only memory-mapped array. Pixels are read only on access
+        :param path: path to raw file
+        :param width: image width
+        :param height: image height
+        :param dtype: pixel channel data type
+        :param channels: number of channels
+        :param offset: offset of pixels data in file in bytes
+        :return: memory-mapped array
+        :rtype: np.memmap
+        """
+        shape = (height, width) if channels == 1 else (height, width, channels)
+        return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+    def set_overlay(self, boxes=None, polygons=None, keypoints=None, labels: [] = None, color=(255, 0, 0),
+                    width: int = 1, group: str = 'default'):
+        """
+        Replace annotation shapes of overlay group. All shapes of group are drawn by one graphics item with one style,
+        so group may be replaced every frame even for thousands of shapes
+        :param boxes: array with shape (N, 4) of boxes [x0, y0, x1, y1] in image coordinates
+        :param polygons: list of arrays with shape (K, 2) of polygons vertices
+        :param keypoints: array with shape (M, 2) of points
+        :param labels: list of N labels for boxes
+        :param color: color of shapes: (r, g, b[, a]) or color name
+        :param width: width of lines in pixels
+        :param group: name of overlay group
+        :return: self instance
+        """
+        if group not in self.__overlays:
+            self.__overlays[group] = self.OverlayItem(color, width)
+            self._instance.scene.addItem(self.__overlays[group])
+        else:
+            self.__overlays[group].setStyle(color, width)
+        self.__overlays[group].setShapes(boxes, polygons, keypoints, labels)
+        return self
+
+    def clear_overlay(self, group: str = None):
+        """
+        Remove overlay group
+        :param group: name of group. All groups are removed if None
+        :return: self instance
+        """
+        for g in list(self.__overlays.keys()) if group is None else [group]:
+            if g in self.__overlays:
+                self._instance.scene.removeItem(self.__overlays.pop(g))
+        return self
+
+    def hit_test_overlay(self, x: float, y: float):
+        """
+        Find overlay shapes, that contain point
+        :param x: x coordinate in image
+        :param y: y coordinate in image
+        :return: dict of {group: (boxes indices, polygons indices)} for groups, that have shapes under point
+        """
+        res = {}
+        for group, item in self.__overlays.items():
+            boxes_idx, polygons_idx = item.hitTest(x, y)
+            if len(boxes_idx) > 0 or len(polygons_idx) > 0:
+                res[group] = (boxes_idx, polygons_idx)
+        return res
+
+    def set_overlay_clicked_callback(self, callback: callable):
+        """
+        Set callback, that called with result of hit_test_overlay when user click to overlay shapes
+        :return: self instance
+        """
+        self.__overlay_clicked_callbacks.append(wrap_callback(callback))
+        return self
+
+    def __on_overlay_clicked(self, x: float, y: float):
+        if len(self.__overlay_clicked_callbacks) < 1:
+            return
+        hits = self.hit_test_overlay(x, y)
+        if len(hits) > 0:
+            for c in self.__overlay_clicked_callbacks:
+                c(hits)
+
+    def push_frame(self, array, is_bgr: bool = False):
+        """
+        Push next frame of live stream. Thread safe.
+        Only newest frame is kept: frames, that weren't displayed before next frame arrived, are dropped. Frames are
+        converted in background thread and displayed not more often than display refresh rate. Current zoom and pan
+        are kept between frames with the same size
+        :param array: frame as NumPy array. See set_image_from_array for supported formats
+        :param is_bgr: is channels are in BGR(A) order
+        """
+        with self.__frames_condition:
+            self.__frames_stats['received'] += 1
+            if self.__pending_frame is not None:
+                self.__frames_stats['dropped'] += 1
+            self.__pending_frame = (array, is_bgr)
+            self.__frames_condition.notify()
+
+            if self.__frames_thread is None:
+                # thread references layout weakly, so it's finished when layout is collected or it's Qt widget is
+                # destroyed
+                self.__frames_thread = threading.Thread(target=ImageLayout.__convert_frames,
+                                                        args=(weakref.ref(self), self.__frames_condition,
+                                                              self.__frames_stop), daemon=True)
+                self.__frames_thread.start()
+                self._instance.destroyed.connect(
+                    lambda *args, condition=self.__frames_condition, stop=self.__frames_stop:
+                    ImageLayout.__stop_frames(condition, stop))
+
+    def get_frames_stats(self):
+        """
+        Get counters of pushed frames
+        :return: dict with number of 'received', 'dropped' and 'displayed' frames
+        """
+        with self.__frames_condition:
+            return dict(self.__frames_stats)
+
+    def __del__(self):
+        if hasattr(self, '_ImageLayout__frames_stop'):
+            ImageLayout.__stop_frames(self.__frames_condition, self.__frames_stop)
+
+    @staticmethod
+    def __stop_frames(condition: threading.Condition, stop: threading.Event):
+        with condition:
+            stop.set()
+            condition.notify_all()
+
+    @staticmethod
+    def __convert_frames(layout_ref: weakref.ref, condition: threading.Condition, stop: threading.Event):
+        while True:
+            with condition:
+                layout = layout_ref()
+                while layout is not None and layout.__pending_frame is None and not stop.is_set():
+                    # strong reference mustn't be kept while waiting, otherwise layout is never collected. Dropping
+                    # of last reference stops thread by __del__
+                    layout = None
+                    if not stop.is_set():
+                        condition.wait()
+                    layout = layout_ref()
+                if layout is None or stop.is_set():
+                    return
+                frame, layout.__pending_frame = layout.__pending_frame, None
+            layout.__convert_frame(*frame)
+            layout = None
+
+    def __convert_frame(self, array, is_bgr: bool):
+        transform = self.__get_display_transform(np.asarray(array))
+        if transform is not None:
+            shape = transform.get_output_shape(np.asarray(array))
+            if self.__frame_buffer is None or self.__frame_buffer.shape != shape:
+                self.__frame_buffer = np.empty(shape, dtype=np.uint8)
+            array, is_bgr = self.__apply_display_transform(array, is_bgr, self.__frame_buffer)
+        image, _ = self.array_to_qimage(array, is_bgr)
+        image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+        with self.__frames_condition:
+            if self.__ready_frame is not None:
+                self.__frames_stats['dropped'] += 1
+            self.__ready_frame = image
+            is_need_notify = not self.__is_display_scheduled
+            self.__is_display_scheduled = True
+        if is_need_notify:
+            self.__instance.frame_ready.emit()
+
+    def __on_frame_ready(self):
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None and screen.refreshRate() > 0 else 60
+        remaining = 1 / refresh_rate - (time.perf_counter() - self.__last_display_time)
+        if remaining > 0:
+            QTimer.singleShot(int(math.ceil(remaining * 1000)), self.__display_frame)
+        else:
+            self.__display_frame()
+
+    def __display_frame(self):
+        if self.__frames_stop.is_set():
+            return
+        with self.__frames_condition:
+            image, self.__ready_frame = self.__ready_frame, None
+            self.__is_display_scheduled = False
+            if image is not None:
+                self.__frames_stats['displayed'] += 1
+        if image is not None:
+            self.__last_display_time = time.perf_counter()
+            self._instance.setFrame(image)
+
+    @staticmethod
+    def array_to_qimage(array, is_bgr: bool = False):
+        """
+        Wrap NumPy array to QImage without copying, if there is suitable QImage format. Otherwise array is converted
+        :param array: uint8 or uint16 array with shape (height, width) or (height, width, channels)
+        :param is_bgr: is channels are in BGR(A) order
+        :return: QImage and owner of it's buffer, that must be kept alive while QImage is used
+        """
+        array = np.asarray(array)
+        if array.dtype not in (np.uint8, np.uint16):
+            raise Exception("Unsupported array dtype for image: {}".format(array.dtype))
+        if array.ndim == 3 and array.shape[2] == 1:
+            array = array[:, :, 0]
+        channels = 1 if array.ndim == 2 else array.shape[2]
+        if array.ndim not in (2, 3) or channels not in (1, 3, 4):
+            raise Exception("Unsupported array shape for image: {}".format(array.shape))
+
+        is_uint8 = array.dtype == np.uint8
+        if channels == 1:
+            image_format = QImage.Format_Grayscale8 if is_uint8 else QImage.Format_Grayscale16
+        elif channels == 3 and is_uint8:
+            bgr_format = getattr(QImage, 'Format_BGR888', None)
+            if is_bgr and bgr_format is None:
+                array, is_bgr = array[:, :, ::-1], False
+            image_format = bgr_format if is_bgr else QImage.Format_RGB888
+        elif channels == 4 and is_uint8:
+            if is_bgr and sys.byteorder != 'little':
+                array, is_bgr = array[:, :, [2, 1, 0, 3]], False
+            image_format = QImage.Format_ARGB32 if is_bgr else QImage.Format_RGBA8888
+        else:
+            if channels == 3:
+                array = np.concatenate((array, np.full(array.shape[:2] + (1,), 65535, dtype=np.uint16)), axis=2)
+            if is_bgr:
+                array = array[:, :, [2, 1, 0, 3]]
+            image_format = QImage.Format_RGBA64
+
+        height, width = array.shape[:2]
+        pixel_size = array.itemsize * (1 if array.ndim == 2 else array.shape[2])
+        if array.strides[1] != pixel_size or (array.ndim == 3 and array.strides[2] != array.itemsize) or \
+                array.strides[0] < width * pixel_size:
+            array = np.ascontiguousarray(array)
+
+        # Rows may be strided: wrap memory from first to last pixel as one contiguous buffer
+        buffer_size = (array.strides[0] * (height - 1) + width * pixel_size) // array.itemsize
+        buffer = np.lib.stride_tricks.as_strided(array, shape=(buffer_size,), strides=(array.itemsize,))
+        image = QImage(memoryview(buffer.view(np.uint8)), width, height, array.strides[0], image_format)
+        return image, array
+
+    def set_image_from_file(self, file_path: str, preview_size: int = 512, tiled_threshold: int = 8192,
+                            on_error: callable = None):
+        """
+        Load image from file asynchronously. Image is decoded in thread pool: downscaled preview is shown first and
+        then replaced by full resolution image. Loading of previous image is cancelled.
+        Uncompressed NumPy (.npy) and binary PGM/PPM files are memory-mapped and shown without copying
+        :param file_path: path to image file
+        :param preview_size: maximum size of preview side. 0 disable preview
+        :param tiled_threshold: memory-mapped images with side bigger than this are shown in tiled mode
+        :param on_error: callback for loading error, that is called in UI thread with exception. If it isn't specified,
+        exception traceback is printed
+        :return: self instance
+        """
+        if not os.path.isfile(file_path):
+            raise Exception("Image file doesn't exists: '{}'".format(file_path))
+
+        self.__load_id += 1
+        self.__shown_array = None
+        if self.__load_future is not None:
+            self.__load_future.cancel()
+        if ImageLayout.__decode_pool is None:
+            ImageLayout.__decode_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2)
+        self.__load_future = ImageLayout.__decode_pool.submit(self.__load_image, self.__load_id, file_path,
+                                                              preview_size, tiled_threshold)
+        self.__load_future.add_done_callback(
+            lambda f, load_id=self.__load_id: self.__on_load_done(f, load_id, on_error))
+        return self
+
+    def __on_load_done(self, future, load_id: int, on_error: callable):
+        if future.cancelled() or load_id != self.__load_id:
+            return
+        exception = future.exception()
+        if exception is None:
+            return
+        if on_error is not None:
+            call_soon_ui(on_error, exception)
+        else:
+            traceback.print_exception(type(exception), exception, exception.__traceback__)
+
+    def __load_image(self, load_id: int, file_path: str, preview_size: int, tiled_threshold: int):
+        array = self.__map_raw_file(file_path)
+        if array is not None:
+            height, width = array.shape[:2]
+        else:
+            reader = QImageReader(file_path)
+            width, height = reader.size().width(), reader.size().height()
+
+        if 0 < preview_size < max(width, height):
+            if array is not None:
+                step = int(math.ceil(max(width, height) / preview_size))
+                preview = self.__to_displayable(np.ascontiguousarray(array[::step, ::step]))
+                preview, data = self.array_to_qimage(preview)
+            else:
+                scale = preview_size / max(width, height)
+                reader.setScaledSize(QSize(max(int(width * scale), 1), max(int(height * scale), 1)))
+                preview, data = reader.read(), None
+            if load_id != self.__load_id:
+                return
+            self.__instance.image_loaded.emit(load_id, preview, data, (width, height))
+
+        if load_id != self.__load_id:
+            return
+        if array is None:
+            image, data = QImageReader(file_path).read(), None
+        elif max(width, height) > tiled_threshold:
+            image, data = None, array
+        else:
+            image, data = self.array_to_qimage(self.__to_displayable(array))
+        self.__instance.image_loaded.emit(load_id, image, data, (width, height))
+
+    def __to_displayable(self, array):
+        # arrays, that can't be wrapped to QImage (16-bit PNM with non-native byte order, float .npy), are mapped by
+        # display transform instead of converting whole file in memory
+        if array.dtype in (np.uint8, np.uint16):
+            return array
+        return self.__apply_display_transform(array, False)[0]
+
+    def __on_image_loaded(self, load_id: int, image, data, size: tuple):
+        if load_id != self.__load_id:
+            return
+        if image is None:
+            self.set_tiled_image(data)
+        elif not image.isNull():
+            self._instance.setFrame(image, data, size)
+
+    @staticmethod
+    def __map_raw_file(file_path: str):
+        """
+        Memory-map uncompressed image file
+        :return: read-only array or None if file format isn't supported
+        """
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension == '.npy':
+            return np.load(file_path, mmap_mode='r')
+        if extension not in ('.pgm', '.ppm', '.pnm'):
+            return None
+
+        with open(file_path, 'rb') as infile:
+            header = infile.read(1024)
+        # only binary graymap and pixmap are mapped, other formats (for example P1/P4 bitmaps) are decoded by Qt
+        if header[:2] not in (b'P5', b'P6'):
+            return None
+        fields, pos = [], 0
+        while len(fields) < 4:
+            while pos < len(header) and header[pos: pos + 1].isspace():
+                pos += 1
+            if header[pos: pos + 1] == b'#':
+                pos = header.index(b'\n', pos)
+                continue
+            end = pos
+            while end < len(header) and not header[end: end + 1].isspace():
+                end += 1
+            fields.append(header[pos: end])
+            pos = end
+
+        width, height, max_value = int(fields[1]), int(fields[2]), int(fields[3])
+        return ImageLayout.open_raw(file_path, width, height, np.uint8 if max_value < 256 else np.dtype('>u2'),
+                                    1 if fields[0] == b'P5' else 3, pos + 1)
+
+    def set_interactive_rendering(self, is_enabled: bool = True, idle_delay: int = 150):
+        """
+        Enable progressive rendering: image is rendered fast (nearest neighbor, no antialiasing) during zooming, panning
+        and resizing, with wheel events coalesced to one zoom per frame. Smooth render follows after input is idle
+        :param is_enabled: is progressive rendering enabled
+        :param idle_delay: delay in milliseconds after last input, when smooth render is done
+        :return: self instance
+        """
+        self._instance.setInteractiveRendering(is_enabled, idle_delay)
+        return self
+
+    def set_size(self, width, height):
+        # self.__pixmap = self.__pixmap.scaledToWidth(width).scaledToHeight(height)
+        # self._instance.setPixmap(self.__pixmap)
+        return self
+
+    def get_size(self):
+        return 0, 0  # self.__pixmap.width(), self.__pixmap.height()
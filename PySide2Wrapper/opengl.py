@@ -0,0 +1,57 @@
+from PySide2.QtOpenGL import QGLWidget
+from PySide2.QtCore import Qt
+
+from .widget import Widget
+
+
+class OpenGLWidget(Widget):
+    def __init__(self, init_callback: callable, resize_callback: callable, draw_callback: callable):
+        super().__init__(QGLWidget())
+        self._layout.addWidget(self._instance)
+
+        self._instance.initializeGL = init_callback
+        self._instance.resizeGL = resize_callback
+        self._instance.paintGL = draw_callback
+        self._instance.setFocusPolicy(Qt.StrongFocus)
+        self._key_buf = [False for _ in range(256)]
+
+    def set_mouse_move_callback(self, callback: callable):
+        def with_update(event):
+            callback(event.pos().x(), event.pos().y())
+            self._instance.updateGL()
+        self._instance.mouseMoveEvent = with_update
+
+    def set_mouse_press_callback(self, callback: callable):
+        self._instance.mousePressEvent = lambda event: callback(event.pos().x(), event.pos().y(), event.buttons() == Qt.LeftButton, True)
+        self._instance.mouseReleaseEvent = lambda event: callback(event.pos().x(), event.pos().y(), event.buttons() == Qt.LeftButton, False)
+
+    def set_wheel_scroll_event(self, callback: callable):
+        def with_update(event):
+            callback(1 if event.delta() > 0 else -1)
+            self._instance.updateGL()
+        self._instance.wheelEvent = lambda event: with_update(event)
+
+    def set_keyboard_event(self, callback: callable):
+        def get_code(event):
+            code = event.key() + 32
+
+            if code < 0 or code > 255:
+                return None
+            return code
+
+        def on_press(event):
+            code = get_code(event)
+            if code is None:
+                return
+            self._key_buf[code] = True
+            callback(self._key_buf)
+            self._instance.updateGL()
+
+        def on_release(event):
+            code = get_code(event)
+            if code is None:
+                return
+            self._key_buf[code] = False
+
+        self._instance.keyPressEvent = on_press
+        self._instance.keyReleaseEvent = on_release
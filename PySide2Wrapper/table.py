@@ -0,0 +1,931 @@
+import ast
+import csv
+import itertools
+import operator
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+from PySide2.QtWidgets import QTableWidget, QHeaderView, QTableWidgetItem, QTableView
+from PySide2.QtCore import QObject, Signal, Qt, QAbstractTableModel, QModelIndex, QTimer
+
+from .widget import Widget, ProgressBar
+from .app import ui_thread
+
+
+_FILTER_COMPARISONS = {ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+                       ast.Gt: operator.gt, ast.GtE: operator.ge}
+_FILTER_OPERATORS = {ast.BitAnd: operator.and_, ast.BitOr: operator.or_}
+
+
+def _parse_filter(expression: str):
+    """
+    Parse filter expression over column values named 'x'. Only comparisons of 'x' with constants, '&', '|', '~' and
+    parentheses are allowed, so expression from user input can't execute any code
+    :param expression: expression, for example '(x > 10) & ~(x == 15)'
+    :return: function, that get column as NumPy array and return boolean mask
+    """
+    try:
+        tree = ast.parse(expression, mode='eval').body
+    except SyntaxError as err:
+        raise Exception("Invalid filter expression '{}': {}".format(expression, err))
+    _check_filter_node(tree, expression)
+    return lambda values: _eval_filter_node(tree, values)
+
+
+def _check_filter_node(node, expression: str):
+    if isinstance(node, ast.Name) and node.id == 'x':
+        return
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float, str, bool):
+        return
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Invert, ast.USub)):
+        return _check_filter_node(node.operand, expression)
+    if isinstance(node, ast.BinOp) and type(node.op) in _FILTER_OPERATORS:
+        _check_filter_node(node.left, expression)
+        return _check_filter_node(node.right, expression)
+    if isinstance(node, ast.Compare) and all(type(op) in _FILTER_COMPARISONS for op in node.ops):
+        for n in [node.left] + node.comparators:
+            _check_filter_node(n, expression)
+        return
+    raise Exception("Unsupported element '{}' in filter expression '{}'".format(ast.dump(node), expression))
+
+
+def _eval_filter_node(node, values):
+    if isinstance(node, ast.Name):
+        return values
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.UnaryOp):
+        operand = _eval_filter_node(node.operand, values)
+        return operator.invert(operand) if isinstance(node.op, ast.Invert) else operator.neg(operand)
+    if isinstance(node, ast.BinOp):
+        return _FILTER_OPERATORS[type(node.op)](_eval_filter_node(node.left, values),
+                                                _eval_filter_node(node.right, values))
+
+    # chained comparison (for example 10 < x < 20) is conjunction of pairwise comparisons
+    mask, left = None, _eval_filter_node(node.left, values)
+    for op, comparator in zip(node.ops, node.comparators):
+        right = _eval_filter_node(comparator, values)
+        cur_mask = _FILTER_COMPARISONS[type(op)](left, right)
+        mask = cur_mask if mask is None else mask & cur_mask
+        left = right
+    return mask
+
+
+class Table(Widget):
+    class Model(QAbstractTableModel):
+        """
+        Table model over caller-supplied rows source. Cells are formatted only when view request it, so table may
+        contain millions of rows without creating any item per cell.
+        Supported rows sources:
+            list of tuples (row-major): [(a0, b0), (a1, b1), ...]
+            dict of columns (column-major), for example NumPy arrays: {'a': array([a0, a1]), 'b': array([b0, b1])}
+            callable row(i), that return tuple for row index i. Rows number must be specified in this case
+        Sorting and filtering are vectorized over NumPy columns. View shows rows through permutation array of source
+        rows indices, so rows are never copied.
+        If capacity is set, model works as ring buffer: oldest rows are evicted after every append over capacity.
+        """
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self._headers = []
+            self._rows = []
+            self._column_keys = []
+            self._columns = None
+            # columns are appended to buffers with spare capacity: [buffer, start] or None, if column isn't own buffer
+            self._buffers = None
+            self._row_getter = None
+            self._rows_num = 0
+            self._capacity = None
+
+            self._order = None
+            self._sort_column, self._is_descending = None, False
+            self._filters = {}
+            self._cache = {}
+
+        def set_headers(self, headers: []):
+            self.beginResetModel()
+            self._headers = list(headers)
+            self.endResetModel()
+
+        def set_rows(self, rows, rows_num: int = None):
+            """
+            Replace rows source
+            :param rows: list of rows, dict of columns or callable row(i)
+            :param rows_num: number of rows. Required only for callable source
+            """
+            self.beginResetModel()
+            self._rows, self._columns, self._row_getter = [], None, None
+            if callable(rows):
+                if rows_num is None:
+                    raise Exception("Rows number doesn't specified for callable rows source")
+                self._row_getter = rows
+                self._rows_num = rows_num
+            elif isinstance(rows, dict):
+                self._column_keys = list(rows.keys())
+                self._columns = [rows[k] for k in self._column_keys]
+                self._buffers = [None] * len(self._columns)
+                if len(self._headers) < 1:
+                    self._headers = [str(k) for k in self._column_keys]
+                self._rows_num = len(self._columns[0]) if len(self._columns) > 0 else 0
+            else:
+                self._rows = rows if isinstance(rows, list) else list(rows)
+                self._rows_num = len(self._rows)
+            self._cache.clear()
+            try:
+                self.__update_order()
+            finally:
+                self.endResetModel()
+
+        def set_capacity(self, capacity: int = None):
+            """
+            Set maximum number of rows. Oldest rows will be evicted when capacity is reached
+            :param capacity: maximum number of rows. None for unlimited
+            """
+            self._capacity = capacity
+            if capacity is not None and self._rows_num > capacity:
+                self.beginResetModel()
+                try:
+                    self.__drop_oldest(self._rows_num - capacity)
+                    self.__update_order()
+                finally:
+                    self.endResetModel()
+
+        def append_rows(self, rows):
+            """
+            Append batch of rows to the end of table by one insert notification
+            :param rows: list of rows or dict of columns (only for column-major source)
+            """
+            if self._row_getter is not None:
+                raise Exception("Can't append rows to callable rows source")
+
+            if self._columns is not None:
+                if not isinstance(rows, dict):
+                    rows = self.__rows_to_columns(rows)
+                if self._capacity is not None:
+                    rows = {k: v[-self._capacity:] for k, v in rows.items()}
+                new_rows_num = len(next(iter(rows.values()))) if len(rows) > 0 else 0
+            else:
+                if isinstance(rows, dict):
+                    raise Exception("Can't append dict of columns to table, that is filled by rows")
+                rows = rows if isinstance(rows, list) else list(rows)
+                if self._capacity is not None:
+                    rows = rows[-self._capacity:]
+                new_rows_num = len(rows)
+            if new_rows_num < 1:
+                return
+
+            first_new_row = self._rows_num
+            if self.is_ordered():
+                self.beginResetModel()
+            else:
+                self.beginInsertRows(QModelIndex(), self._rows_num, self._rows_num + new_rows_num - 1)
+            if self._columns is not None:
+                for i, k in enumerate(self._column_keys):
+                    self.__extend_column(i, rows[k])
+            else:
+                self._rows.extend(rows)
+            self._rows_num += new_rows_num
+            self.__extend_cache(first_new_row)
+
+            excess = 0 if self._capacity is None else self._rows_num - self._capacity
+            if self.is_ordered():
+                # new rows are merged to current order, so streaming to sorted table doesn't re-sort whole table
+                try:
+                    if self._order is None:
+                        self.__drop_oldest(excess)
+                        self.__update_order()
+                    else:
+                        self._order = self.__merge_order(first_new_row)
+                        self.__drop_oldest(excess)
+                except Exception:
+                    self._order = None
+                    raise
+                finally:
+                    self.endResetModel()
+                return
+
+            self.endInsertRows()
+            if excess > 0:
+                self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+                self.__drop_oldest(excess)
+                self.endRemoveRows()
+
+        def remove_row(self, idx: int):
+            """
+            Remove row by it's index in view
+            :param idx: row index
+            """
+            if idx < 0 or idx >= self.rowCount():
+                return
+            if self._row_getter is not None:
+                raise Exception("Can't remove rows from callable rows source")
+
+            self.beginRemoveRows(QModelIndex(), idx, idx)
+            idx = self.source_idx(idx)
+            if self._columns is not None:
+                self._columns = [self.__concatenate(c[:idx], c[idx + 1:]) for c in self._columns]
+                self._buffers = [None] * len(self._columns)
+            else:
+                del self._rows[idx]
+            self._rows_num -= 1
+            self._cache.clear()
+            if self._order is not None:
+                order = self._order[self._order != idx]
+                self._order = order - (order > idx)
+            self.endRemoveRows()
+
+        def source_idx(self, idx: int):
+            """
+            Get index of row in rows source by it's index in view
+            """
+            return idx if self._order is None else int(self._order[idx])
+
+        def get_row(self, idx: int):
+            """
+            Get row by it's index in view
+            """
+            idx = self.source_idx(idx)
+            if self._row_getter is not None:
+                return self._row_getter(idx)
+            if self._columns is not None:
+                return tuple(c[idx] for c in self._columns)
+            return self._rows[idx]
+
+        def get_column(self, column: int):
+            """
+            Get column of source as NumPy array. Columns of row-major and callable sources are built once and cached
+            until source change
+            :param column: column index
+            :return: column values in source order
+            :rtype: np.ndarray
+            """
+            key = ('column', column)
+            if key not in self._cache:
+                if self._columns is not None:
+                    values = np.asarray(self._columns[column])
+                elif self._row_getter is not None:
+                    values = np.array([self._row_getter(i)[column] for i in range(self._rows_num)])
+                else:
+                    values = np.array([r[column] for r in self._rows])
+                self._cache[key] = values
+            return self._cache[key]
+
+        def sort(self, column: int, order=Qt.AscendingOrder):
+            """
+            Sort rows by column. Called by view for column header clicks
+            :param column: column index. Negative value disable sorting
+            :param order: Qt.AscendingOrder or Qt.DescendingOrder
+            """
+            self.__reorder(column if 0 <= column < self.columnCount() else None, order == Qt.DescendingOrder,
+                           self._filters)
+
+        def set_filter(self, column: int, predicate):
+            """
+            Set filter for column. Only rows, that passed all filters will be shown
+            :param column: column index
+            :param predicate: callable, that get column as NumPy array and return boolean mask or string expression
+            over column values named 'x' (for example '(x > 10) & (x < 20)'). None remove filter from column
+            """
+            filters = dict(self._filters)
+            if predicate is None:
+                filters.pop(column, None)
+            else:
+                filters[column] = _parse_filter(predicate) if isinstance(predicate, str) else predicate
+            self.__reorder(self._sort_column, self._is_descending, filters)
+
+        def reset_filters(self):
+            self.__reorder(self._sort_column, self._is_descending, {})
+
+        def search(self, column: int, text: str):
+            """
+            Case-insensitive substring search over column
+            :param column: column index
+            :param text: text to search
+            :return: indices of view rows, that contain text
+            :rtype: np.ndarray
+            """
+            key = ('search_index', column)
+            if key not in self._cache:
+                self._cache[key] = np.char.lower(self.get_column(column).astype(str))
+            mask = np.char.find(self._cache[key], text.lower()) >= 0
+            return np.flatnonzero(mask if self._order is None else mask[self._order])
+
+        def snapshot(self):
+            """
+            Get snapshot of current view rows. Snapshot is cheap: rows list is copied by references, columns and order
+            arrays are never modified in place
+            :rtype: Table.Snapshot
+            """
+            return Table.Snapshot(list(self._headers), self.rowCount(), list(self._rows),
+                                  None if self._columns is None else list(self._columns), self._row_getter, self._order)
+
+        def is_ordered(self):
+            return self._sort_column is not None or len(self._filters) > 0
+
+        def rowCount(self, parent=QModelIndex()):
+            if parent.isValid():
+                return 0
+            return self._rows_num if self._order is None else len(self._order)
+
+        def columnCount(self, parent=QModelIndex()):
+            if parent.isValid():
+                return 0
+            if self._columns is not None:
+                return max(len(self._columns), len(self._headers))
+            return len(self._headers)
+
+        def data(self, index, role=Qt.DisplayRole):
+            if role != Qt.DisplayRole or not index.isValid():
+                return None
+            try:
+                row = self.source_idx(index.row())
+                value = self._columns[index.column()][row] if self._columns is not None else \
+                    (self._row_getter(row) if self._row_getter is not None else self._rows[row])[index.column()]
+            except IndexError:
+                return None
+            return None if value is None else str(value)
+
+        def headerData(self, section, orientation, role=Qt.DisplayRole):
+            if role != Qt.DisplayRole:
+                return None
+            if orientation == Qt.Horizontal:
+                return self._headers[section] if section < len(self._headers) else None
+            return str(section + 1)
+
+        def __reorder(self, sort_column: int, is_descending: bool, filters: {}):
+            # order is computed before model reset, so failed filter doesn't break the view
+            order = self.__compute_order(sort_column, is_descending, filters)
+            self.beginResetModel()
+            self._sort_column, self._is_descending, self._filters = sort_column, is_descending, filters
+            self._order = order
+            self.endResetModel()
+
+        def __update_order(self):
+            try:
+                self._order = self.__compute_order(self._sort_column, self._is_descending, self._filters)
+            except Exception:
+                self._order = None
+                raise
+
+        def __compute_order(self, sort_column: int, is_descending: bool, filters: {}):
+            if (sort_column is None and len(filters) < 1) or self._rows_num < 1:
+                return None
+
+            mask = None
+            for column, predicate in filters.items():
+                cur_mask = self.__eval_filter(predicate, self.get_column(column))
+                mask = cur_mask if mask is None else mask & cur_mask
+
+            if sort_column is not None:
+                perm = np.argsort(self.get_column(sort_column), kind='stable')
+                if is_descending:
+                    perm = perm[::-1]
+                return perm if mask is None else perm[mask[perm]]
+            return np.flatnonzero(mask)
+
+        def __merge_order(self, first_new_row: int):
+            new_indices = np.arange(first_new_row, self._rows_num)
+            for column, predicate in self._filters.items():
+                new_indices = new_indices[self.__eval_filter(predicate, self.get_column(column)[first_new_row:])]
+            if self._sort_column is None:
+                return np.concatenate((self._order, new_indices))
+
+            # order is kept equal to stable sort of whole column: new rows are placed after equal old rows for
+            # ascending order and before them for descending order
+            column = self.get_column(self._sort_column)
+            new_indices = new_indices[np.argsort(column[new_indices], kind='stable')]
+            keys = column[self._order]
+            if self._is_descending:
+                new_indices = new_indices[::-1]
+                positions = len(keys) - np.searchsorted(keys[::-1], column[new_indices], side='right')
+            else:
+                positions = np.searchsorted(keys, column[new_indices], side='right')
+            return np.insert(self._order, positions, new_indices)
+
+        @staticmethod
+        def __eval_filter(predicate, values):
+            return np.broadcast_to(np.asarray(predicate(values), dtype=bool), values.shape)
+
+        def __extend_cache(self, first_new_row: int):
+            for key in list(self._cache.keys()):
+                kind, column = key
+                if self._columns is not None:
+                    new_values = np.asarray(self._columns[column])[first_new_row:]
+                else:
+                    new_values = np.array([r[column] for r in self._rows[first_new_row:]])
+                if kind == 'search_index':
+                    new_values = np.char.lower(new_values.astype(str))
+                try:
+                    self._cache[key] = np.concatenate((self._cache[key], new_values))
+                except Exception:
+                    del self._cache[key]
+
+        def __drop_oldest(self, rows_num: int):
+            if rows_num < 1:
+                return
+            if self._columns is not None:
+                self._columns = [c[rows_num:] for c in self._columns]
+                for buffer in self._buffers:
+                    if buffer is not None:
+                        buffer[1] += rows_num
+            else:
+                del self._rows[:rows_num]
+            self._rows_num -= rows_num
+            self._cache = {k: v[rows_num:] for k, v in self._cache.items()}
+            if self._order is not None:
+                self._order = self._order[self._order >= rows_num] - rows_num
+
+        def __rows_to_columns(self, rows):
+            rows = rows if isinstance(rows, list) else list(rows)
+            for row in rows:
+                if len(row) != len(self._column_keys):
+                    raise Exception("Row has {} items, but table has {} columns".format(len(row), len(self._column_keys)))
+            return {k: [row[i] for row in rows] for i, k in enumerate(self._column_keys)}
+
+        def __extend_column(self, idx: int, values):
+            # buffer grows geometrically, so appending of rows by small batches takes amortized linear time.
+            # Column is view of buffer and region after it is written only, so snapshots of column aren't changed
+            column, values = np.asarray(self._columns[idx]), np.asarray(values)
+            try:
+                dtype = np.result_type(column, values)
+            except TypeError:
+                dtype = np.dtype(object)
+            size, new_size = len(column), len(column) + len(values)
+
+            buffer = self._buffers[idx]
+            if buffer is None or buffer[0].dtype != dtype or buffer[1] + new_size > len(buffer[0]):
+                data = np.empty((max(2 * new_size, 1024),) + column.shape[1:], dtype=dtype)
+                data[:size] = column
+                buffer = self._buffers[idx] = [data, 0]
+
+            data, start = buffer
+            data[start + size: start + new_size] = values
+            self._columns[idx] = data[start: start + new_size]
+
+        @staticmethod
+        def __concatenate(first, second):
+            if isinstance(first, list):
+                return first + list(second)
+            return np.concatenate((first, second))
+
+    class Snapshot:
+        """
+        Rows of virtual table view, that are independent from further table changes. Used for export in background
+        """
+
+        def __init__(self, headers: [], rows_num: int, rows: [], columns: [], row_getter: callable, order):
+            self.headers = headers
+            self.rows_num = rows_num
+            self.__rows, self.__columns, self.__row_getter, self.__order = rows, columns, row_getter, order
+
+        def get_rows(self, start: int, stop: int):
+            """
+            Get rows in range [start, stop) as list of tuples
+            """
+            indices = range(start, stop) if self.__order is None else self.__order[start: stop]
+            if self.__columns is not None:
+                return list(zip(*self.get_columns(start, stop)))
+            if self.__row_getter is not None:
+                return [self.__row_getter(int(i)) for i in indices]
+            return [self.__rows[i] for i in indices]
+
+        def get_columns(self, start: int, stop: int):
+            """
+            Get rows in range [start, stop) as list of NumPy columns
+            """
+            if self.__columns is not None:
+                indices = slice(start, stop) if self.__order is None else self.__order[start: stop]
+                return [np.asarray(c)[indices] for c in self.__columns]
+            return [np.array(c) for c in zip(*self.get_rows(start, stop))]
+
+    class Instance(QObject):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+
+        rows_loaded = Signal(int, object, bool)
+        headers_loaded = Signal(int, list)
+
+    def __init__(self, is_virtual: bool = False):
+        """
+        Table constructor
+        :param is_virtual: is need to use model-backed table. Virtual table don't create item for every cell and
+        show only visible cells, so it's suitable for big amount of rows
+        """
+        self.__model = None
+        if is_virtual:
+            super().__init__(QTableView())
+            self.__model = self.Model(self._instance)
+            self._instance.setModel(self.__model)
+            self._instance.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+            self._instance.setSortingEnabled(True)
+        else:
+            super().__init__(QTableWidget())
+        self._instance.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self._layout.addWidget(self._instance)
+
+        self.__instance = self.Instance()
+        self.__instance.headers_loaded.connect(self.__on_headers_loaded)
+        self.__instance.rows_loaded.connect(self.__on_rows_loaded)
+        self.__load_id = 0
+
+        self.__stream_queue = deque()
+        self.__stream_timer = None
+        self.__stream_batch_size = None
+        self.__is_follow_tail = False
+
+    def is_virtual(self):
+        return self.__model is not None
+
+    @ui_thread()
+    def add_row(self, items: []):
+        if self.__model is not None:
+            self.__model.append_rows([items])
+            return self
+
+        row_idx = self._instance.rowCount()
+        self._instance.setRowCount(row_idx + 1)
+        for i, item in enumerate(items):
+            self._instance.setItem(row_idx, i, QTableWidgetItem(item))
+        return self
+
+    @ui_thread(collapse=True)
+    def set_rows(self, rows, rows_num: int = None):
+        """
+        Replace all table rows by one model reset
+        :param rows: list of rows, dict of columns (for example NumPy arrays) or callable row(i). Dict of columns and
+        callable are supported only by virtual table
+        :param rows_num: number of rows for callable rows source
+        :return: self instance
+        """
+        if self.__model is not None:
+            self.__model.set_rows(rows, rows_num)
+            return self
+
+        if callable(rows) or isinstance(rows, dict):
+            raise Exception("Table supports only list of rows. Use virtual table for another rows sources")
+        self._instance.setRowCount(0)
+        return self.append_rows(rows)
+
+    @ui_thread()
+    def append_rows(self, rows):
+        """
+        Append rows batch to the end of table by one insert notification
+        :param rows: list of rows or dict of columns (if table was filled by columns)
+        :return: self instance
+        """
+        if self.__model is not None:
+            self.__model.append_rows(rows)
+            return self
+
+        rows = rows if isinstance(rows, list) else list(rows)
+        first_row_idx = self._instance.rowCount()
+        self._instance.setUpdatesEnabled(False)
+        self._instance.setRowCount(first_row_idx + len(rows))
+        for row_idx, items in enumerate(rows, first_row_idx):
+            for i, item in enumerate(items):
+                self._instance.setItem(row_idx, i, QTableWidgetItem(str(item)))
+        self._instance.setUpdatesEnabled(True)
+        return self
+
+    def start_streaming(self, capacity: int = None, is_follow_tail: bool = True, interval: int = 16,
+                        max_batch_size: int = 100000):
+        """
+        Start streaming mode of virtual table. In this mode rows may be pushed by push_row/push_rows from any thread.
+        Pushed rows are queued and inserted to table by one batch per UI frame
+        :param capacity: maximum number of rows in table. Oldest rows are evicted when capacity is reached
+        :param is_follow_tail: is need to scroll to last row after insertion. Scrolling is paused while user is
+        looking to rows above the end of table
+        :param interval: interval between batches insertion in milliseconds
+        :param max_batch_size: maximum number of rows, inserted per one batch
+        :return: self instance
+        """
+        self.__get_model().set_capacity(capacity)
+        self.__is_follow_tail = is_follow_tail
+        self.__stream_batch_size = max_batch_size
+
+        if self.__stream_timer is None:
+            self.__stream_timer = QTimer(self._instance)
+            self.__stream_timer.timeout.connect(self.__flush_stream)
+        self.__stream_timer.start(interval)
+        return self
+
+    def stop_streaming(self):
+        """
+        Stop streaming mode. Rows, that already queued will be inserted to table
+        :return: self instance
+        """
+        if self.__stream_timer is not None:
+            self.__stream_timer.stop()
+            self.__stream_batch_size = None
+            self.__flush_stream()
+        return self
+
+    def set_follow_tail(self, is_follow_tail: bool):
+        self.__is_follow_tail = is_follow_tail
+        return self
+
+    def push_row(self, row):
+        """
+        Push row to streaming table. Thread safe
+        :param row: row items
+        """
+        self.__stream_queue.append(row)
+
+    def push_rows(self, rows: []):
+        """
+        Push rows batch to streaming table. Thread safe
+        :param rows: list of rows
+        """
+        self.__stream_queue.extend(rows)
+
+    def __flush_stream(self):
+        stream_queue = self.__stream_queue
+        rows_num = len(stream_queue) if self.__stream_batch_size is None else \
+            min(len(stream_queue), self.__stream_batch_size)
+        if rows_num < 1:
+            return
+
+        rows = [stream_queue.popleft() for _ in range(rows_num)]
+        scroll_bar = self._instance.verticalScrollBar()
+        is_at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        self.__model.append_rows(rows)
+        if self.__is_follow_tail and is_at_bottom:
+            self._instance.scrollToBottom()
+
+    def load_csv(self, path: str, progress_bar: ProgressBar = None, has_header: bool = True, delimiter: str = ',',
+                 encoding: str = 'utf-8', chunk_size: int = 50000):
+        """
+        Load CSV file to virtual table. File is parsed by chunks in background thread and every chunk is appended to
+        table as soon as it's parsed. First chunks are small, so first rows are shown almost immediately.
+        Columns, that contain only integer or float values (empty cells are NaN) are converted to numeric arrays, so
+        they are sorted and filtered as numbers. Number of columns is defined by header or by widest row of first chunk
+        :param path: path to CSV file
+        :param progress_bar: ProgressBar, that show loading progress
+        :param has_header: is first line of file contain columns headers. Columns are numbered from 1 otherwise
+        :param delimiter: fields delimiter
+        :param encoding: file encoding
+        :param chunk_size: maximum number of rows in chunk
+        :return: self instance
+        """
+        load_id = self.__start_loading()
+
+        def read():
+            file_size = max(os.path.getsize(path), 1)
+            read_bytes = 0
+
+            with open(path, 'rb') as infile:
+                def lines():
+                    nonlocal read_bytes
+                    for line in infile:
+                        read_bytes += len(line)
+                        yield line.decode(encoding)
+
+                reader = csv.reader(lines(), delimiter=delimiter)
+                headers = next(reader, []) if has_header else None
+                if headers is not None:
+                    self.__instance.headers_loaded.emit(load_id, headers)
+
+                width = None
+                for chunk in self.__read_chunks(reader, chunk_size):
+                    if load_id != self.__load_id:
+                        return
+                    is_first_chunk = width is None
+                    if is_first_chunk:
+                        width = len(headers) if headers else max(len(row) for row in chunk)
+                        if headers is None:
+                            self.__instance.headers_loaded.emit(load_id, [str(i + 1) for i in range(width)])
+                    self.__instance.rows_loaded.emit(load_id, self.__chunk_to_columns(chunk, width), is_first_chunk)
+                    if progress_bar is not None:
+                        progress_bar.set_value(int(100 * read_bytes / file_size), os.path.basename(path))
+
+        self.__run_in_background(read, progress_bar)
+        return self
+
+    def load_parquet(self, path: str, progress_bar: ProgressBar = None, chunk_size: int = 50000):
+        """
+        Load Parquet file to virtual table. File is read by record batches in background thread. Requires pyarrow
+        :param path: path to Parquet file
+        :param progress_bar: ProgressBar, that show loading progress
+        :param chunk_size: maximum number of rows in chunk
+        :return: self instance
+        """
+        parquet = self.__import_parquet()
+        load_id = self.__start_loading()
+
+        def read():
+            parquet_file = parquet.ParquetFile(path)
+            headers = parquet_file.schema_arrow.names
+            self.__instance.headers_loaded.emit(load_id, headers)
+
+            rows_num, read_rows_num = max(parquet_file.metadata.num_rows, 1), 0
+            for batch in parquet_file.iter_batches(batch_size=chunk_size):
+                if load_id != self.__load_id:
+                    return
+                columns = {h: c.to_numpy(zero_copy_only=False) for h, c in zip(headers, batch.columns)}
+                self.__instance.rows_loaded.emit(load_id, columns, read_rows_num == 0)
+                read_rows_num += batch.num_rows
+                if progress_bar is not None:
+                    progress_bar.set_value(int(100 * read_rows_num / rows_num), os.path.basename(path))
+
+        self.__run_in_background(read, progress_bar)
+        return self
+
+    def export_csv(self, path: str, progress_bar: ProgressBar = None, delimiter: str = ',',
+                   encoding: str = 'utf-8', chunk_size: int = 50000):
+        """
+        Export rows of virtual table in current view order to CSV file. File is written by chunks in background thread
+        :param path: path to CSV file
+        :param progress_bar: ProgressBar, that show export progress
+        :param delimiter: fields delimiter
+        :param encoding: file encoding
+        :param chunk_size: number of rows in chunk
+        :return: self instance
+        """
+        snapshot = self.__get_model().snapshot()
+
+        def write():
+            with open(path, 'w', newline='', encoding=encoding) as outfile:
+                writer = csv.writer(outfile, delimiter=delimiter)
+                if len(snapshot.headers) > 0:
+                    writer.writerow(snapshot.headers)
+                for start in range(0, snapshot.rows_num, chunk_size):
+                    writer.writerows(snapshot.get_rows(start, min(start + chunk_size, snapshot.rows_num)))
+                    if progress_bar is not None:
+                        progress_bar.set_value(int(100 * (start + chunk_size) / max(snapshot.rows_num, 1)),
+                                               os.path.basename(path))
+
+        self.__run_in_background(write, progress_bar)
+        return self
+
+    def export_parquet(self, path: str, progress_bar: ProgressBar = None, chunk_size: int = 50000):
+        """
+        Export rows of virtual table in current view order to Parquet file. Requires pyarrow
+        :param path: path to Parquet file
+        :param progress_bar: ProgressBar, that show export progress
+        :param chunk_size: number of rows in row group
+        :return: self instance
+        """
+        parquet = self.__import_parquet()
+        import pyarrow
+
+        snapshot = self.__get_model().snapshot()
+        headers = [str(h) for h in snapshot.headers]
+
+        def write():
+            writer = None
+            try:
+                for start in range(0, snapshot.rows_num, chunk_size):
+                    columns = snapshot.get_columns(start, min(start + chunk_size, snapshot.rows_num))
+                    names = headers if len(headers) == len(columns) else [str(i) for i in range(len(columns))]
+                    batch = pyarrow.Table.from_arrays([pyarrow.array(c) for c in columns], names=names)
+                    if writer is None:
+                        writer = parquet.ParquetWriter(path, batch.schema)
+                    writer.write_table(batch)
+                    if progress_bar is not None:
+                        progress_bar.set_value(int(100 * (start + chunk_size) / max(snapshot.rows_num, 1)),
+                                               os.path.basename(path))
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        self.__run_in_background(write, progress_bar)
+        return self
+
+    def __start_loading(self):
+        self.__load_id += 1
+        self.__get_model().set_rows([])
+        return self.__load_id
+
+    def __on_headers_loaded(self, load_id: int, headers: list):
+        if load_id == self.__load_id:
+            self.set_columns_headers(headers)
+
+    def __on_rows_loaded(self, load_id: int, rows, is_first_chunk: bool):
+        if load_id != self.__load_id:
+            return
+        if is_first_chunk:
+            self.__model.set_rows(rows)
+        else:
+            self.__model.append_rows(rows)
+
+    @staticmethod
+    def __chunk_to_columns(chunk: [], width: int):
+        columns = {}
+        for i in range(width):
+            values = np.array([row[i] if i < len(row) else '' for row in chunk])
+            try:
+                columns[i] = values.astype(np.int64)
+                continue
+            except (ValueError, OverflowError):
+                pass
+            try:
+                columns[i] = np.where(values == '', 'nan', values).astype(np.float64)
+            except ValueError:
+                columns[i] = values
+        return columns
+
+    @staticmethod
+    def __read_chunks(reader, max_chunk_size: int):
+        chunk_size = min(1000, max_chunk_size)
+        while True:
+            chunk = list(itertools.islice(reader, chunk_size))
+            if len(chunk) < 1:
+                return
+            yield chunk
+            chunk_size = min(chunk_size * 4, max_chunk_size)
+
+    @staticmethod
+    def __run_in_background(target: callable, progress_bar: ProgressBar = None):
+        def run():
+            try:
+                target()
+            except Exception as err:
+                if progress_bar is not None:
+                    progress_bar.set_value(0, "Error: {}".format(err))
+                raise
+            if progress_bar is not None:
+                progress_bar.set_value(100, "Done")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    @staticmethod
+    def __import_parquet():
+        try:
+            import pyarrow.parquet as parquet
+        except ImportError:
+            raise Exception("Parquet support requires pyarrow")
+        return parquet
+
+    def sort(self, column, is_descending: bool = False):
+        """
+        Sort virtual table rows by column
+        :param column: column index or header
+        :param is_descending: is need to sort in descending order
+        :return: self instance
+        """
+        self._instance.sortByColumn(self.__column_idx(column), Qt.DescendingOrder if is_descending else Qt.AscendingOrder)
+        return self
+
+    def set_filter(self, column, predicate):
+        """
+        Set filter for virtual table column. Filter is applied to whole column at once, so predicate must be vectorized
+        :param column: column index or header
+        :param predicate: callable, that get column as NumPy array and return boolean mask (for example
+        lambda x: x > 10) or string expression over column values named 'x' (for example '(x > 10) & (x < 20)').
+        Expression may contain only comparisons of 'x' with constants, '&', '|', '~' and parentheses.
+        None remove filter from column
+        :return: self instance
+        """
+        self.__get_model().set_filter(self.__column_idx(column), predicate)
+        return self
+
+    def reset_filters(self):
+        self.__get_model().reset_filters()
+        return self
+
+    def search(self, column, text: str):
+        """
+        Case-insensitive substring search over virtual table column
+        :param column: column index or header
+        :param text: text to search
+        :return: indices of rows in current view order, that contain text
+        :rtype: np.ndarray
+        """
+        return self.__get_model().search(self.__column_idx(column), text)
+
+    def get_rows_num(self):
+        return self.__model.rowCount() if self.__model is not None else self._instance.rowCount()
+
+    def del_row(self):
+        if self.__model is not None:
+            self.__model.remove_row(self._instance.currentIndex().row())
+            return self
+
+        current_row = self._instance.currentRow()
+        self._instance.removeRow(current_row)
+        return self
+
+    def set_columns_headers(self, headers: []):
+        if self.__model is not None:
+            self.__model.set_headers(headers)
+            return self
+
+        self._instance.setColumnCount(len(headers))
+        self._instance.setHorizontalHeaderLabels(headers)
+        return self
+
+    def __get_model(self):
+        if self.__model is None:
+            raise Exception("Operation supported only by virtual Table")
+        return self.__model
+
+    def __column_idx(self, column):
+        if isinstance(column, str):
+            headers = [self.__get_model().headerData(i, Qt.Horizontal) for i in range(self.__model.columnCount())]
+            if column not in headers:
+                raise Exception("Table doesn't contain column '{}'".format(column))
+            return headers.index(column)
+        return column
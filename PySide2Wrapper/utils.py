@@ -1,46 +1,358 @@
 import json
 import os
+import threading
+import weakref
+from multiprocessing import shared_memory
 
 
 class StateSaver:
     """
     StateSaver is a ui state manager. This works with Window and store it's widget states in file.
     That may used for restore ui state between process starts.
+    In autosave mode changed states are appended to journal file after short delay and journal is compacted to states
+    file in background, so crash loses only last changes.
+    Widgets may be joined to groups (for example widgets of one tab). States of group widgets are restored only by
+    restore_group call, when group becomes visible
     """
     def __init__(self, store_path: str):
         self.__path = store_path
+        self.__journal_path = store_path + '.journal'
         self.__is_loaded = False
-        self.__widgets = []
+        self.__is_restoring = False
+        self.__widgets = {}
+        self.__groups = {}
+        self.__next_default_key = 0
+        self.__restored_groups = set()
+        self.__states = {}
 
-    def add_widget(self, widget):
+        self.__lock = threading.Lock()
+        self.__autosave_delay = None
+        self.__max_journal_entries = None
+        self.__journal_entries_num = 0
+        self.__dirty = {}
+        self.__timer = None
+
+    def add_widget(self, widget, key: str = None, group=None):
         """
         Add widget to StateSaver
         :param widget: widget object
+        :param key: stable key of widget state. Widget index is used by default, so it's changed if widgets are reordered
+        :param group: group of widget. If None, widget state is restored by load
+        :return: key of widget state
+        """
+        if key is None:
+            # widget index, like before removals, but default key isn't repeated after remove_widget
+            self.__next_default_key = max(self.__next_default_key, len(self.__widgets))
+            key = str(self.__next_default_key)
+            self.__next_default_key += 1
+        else:
+            key = str(key)
+        if key in self.__widgets:
+            raise Exception("Widget with key '{}' already added to StateSaver".format(key))
+        self.__widgets[key] = widget
+        self.__groups[key] = group
+
+        callback = lambda *args: self.__on_value_changed(key, widget)
+        if hasattr(widget, 'set_value_changed_callback'):
+            widget.set_value_changed_callback(callback)
+        elif hasattr(widget, 'add_clicked_callback'):
+            widget.add_clicked_callback(callback)
+
+        if self.__is_loaded and self.__is_group_restored(group):
+            self.__restore([key])
+        return key
+
+    def remove_widget(self, key: str):
+        """
+        Remove widget from StateSaver, for example before widget destroying. Current state of widget is kept and
+        restored to widget, that will be added with the same key
+        :param key: key of widget state
+        :return: self instance
+        """
+        widget = self.__widgets.pop(key, None)
+        group = self.__groups.pop(key, None)
+        if widget is None or not self.__is_loaded or not self.__is_group_restored(group):
+            return self
+
+        value = widget.get_value()
+        with self.__lock:
+            if self.__is_value_stored(value):
+                self.__states[key] = value
+            else:
+                self.__states.pop(key, None)
+        return self
+
+    def set_group(self, keys: [str], group):
+        """
+        Move widgets to group. It's actual only before load or for groups, that isn't restored yet
+        :param keys: keys of widgets states
+        :param group: group
+        :return: self instance
+        """
+        for key in keys:
+            self.__groups[key] = group
+        return self
+
+    def restore_group(self, group):
+        """
+        Restore states of group widgets. Does nothing if group already restored. If it's called before load, group is
+        restored by load
+        :param group: group
+        :return: self instance
+        """
+        if group is None or group in self.__restored_groups:
+            return self
+
+        self.__restored_groups.add(group)
+        if self.__is_loaded:
+            self.__restore([k for k, g in self.__groups.items() if g == group])
+        return self
+
+    def enable_autosave(self, delay: float = 0.5, max_journal_entries: int = 1000):
+        """
+        Enable autosave mode: states of changed widgets are written to journal file after delay
+        :param delay: delay of write in seconds. All changes during delay are written by one journal append
+        :param max_journal_entries: number of journal entries, after that journal is compacted to states file
+        :return: self instance
         """
-        self.__widgets.append(widget)
+        self.__autosave_delay = delay
+        self.__max_journal_entries = max_journal_entries
+        return self
 
     def write(self):
         """
         Write all states of all widgets to file
         """
-        data = {i: w for i, w in enumerate(self.__widgets) if not (type(w.get_value()) is str and w.get_value() == "") and w.get_value() is not None}
-        with open(self.__path, 'w') as outfile:
-            json.dump(data, outfile, default=lambda w: w.get_value())
+        with self.__lock:
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            self.__dirty = {}
+
+            for k, w in self.__widgets.items():
+                # widgets of not restored groups keep loaded states
+                if self.__is_loaded and not self.__is_group_restored(self.__groups[k]):
+                    continue
+
+                value = w.get_value()
+                if self.__is_value_stored(value):
+                    self.__states[k] = value
+                else:
+                    self.__states.pop(k, None)
+            self.__compact()
 
     def load(self):
         """
-        Load all states of all widgets from file
+        Load all states from file and journal and restore states of widgets without group or with already restored
+        group. Broken journal entries are skipped
         """
-        if self.__is_loaded or (not (os.path.exists(self.__path) and os.path.isfile(self.__path))):
+        if self.__is_loaded:
             return
 
+        with self.__lock:
+            self.__states = self.__read_states()
+            # changes before load are defaults, that are set while ui is built, so they mustn't override loaded states
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None
+            self.__dirty = {}
+
+        self.__is_loaded = True
+        self.__restore([k for k, g in self.__groups.items() if self.__is_group_restored(g)])
+
+    def __is_group_restored(self, group):
+        return group is None or group in self.__restored_groups
+
+    def __restore(self, keys: [str]):
+        self.__is_restoring = True
         try:
-            with open(self.__path, 'r') as infile:
-                states = json.load(infile)
+            for k in keys:
+                if k not in self.__states:
+                    continue
+                try:
+                    self.__widgets[k].set_value(self.__states[k])
+                except Exception:
+                    pass
+        finally:
+            self.__is_restoring = False
 
-            for k, v in states.items():
-                self.__widgets[int(k)].set_value(v)
-        except:
-            os.remove(self.__path)
+    def __read_states(self):
+        states = {}
+        if os.path.isfile(self.__path):
+            try:
+                with open(self.__path, 'r') as infile:
+                    states = json.load(infile)
+            except (OSError, ValueError):
+                states = {}
 
-        self.__is_loaded = True
+        self.__journal_entries_num = 0
+        if os.path.isfile(self.__journal_path):
+            with open(self.__journal_path, 'r') as infile:
+                for line in infile:
+                    try:
+                        entry = json.loads(line)
+                        if entry['v'] is None:
+                            states.pop(entry['k'], None)
+                        else:
+                            states[entry['k']] = entry['v']
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    self.__journal_entries_num += 1
+
+        return states
+
+    @staticmethod
+    def __is_value_stored(value):
+        return value is not None and not (type(value) is str and value == "")
+
+    def __on_value_changed(self, key: str, widget):
+        if self.__is_restoring or self.__autosave_delay is None or not self.__is_loaded:
+            return
+        # widgets of not restored groups keep loaded states, like in write
+        if key not in self.__widgets or not self.__is_group_restored(self.__groups[key]):
+            return
+
+        value = widget.get_value()
+        with self.__lock:
+            self.__dirty[key] = value if self.__is_value_stored(value) else None
+            if self.__timer is None:
+                self.__timer = threading.Timer(self.__autosave_delay, self.__flush)
+                self.__timer.daemon = True
+                self.__timer.start()
+
+    def __flush(self):
+        with self.__lock:
+            self.__timer = None
+            dirty, self.__dirty = self.__dirty, {}
+            if len(dirty) < 1:
+                return
+
+            for k, v in dirty.items():
+                if v is None:
+                    self.__states.pop(k, None)
+                else:
+                    self.__states[k] = v
+
+            with open(self.__journal_path, 'a') as outfile:
+                for k, v in dirty.items():
+                    outfile.write(json.dumps({'k': k, 'v': v}) + '\n')
+                outfile.flush()
+                os.fsync(outfile.fileno())
+            self.__journal_entries_num += len(dirty)
+
+            if self.__journal_entries_num >= self.__max_journal_entries:
+                self.__compact()
+
+    def __compact(self):
+        tmp_path = self.__path + '.tmp'
+        with open(tmp_path, 'w') as outfile:
+            json.dump(self.__states, outfile)
+            outfile.flush()
+            os.fsync(outfile.fileno())
+        os.replace(tmp_path, self.__path)
+
+        if os.path.exists(self.__journal_path):
+            os.remove(self.__journal_path)
+        self.__journal_entries_num = 0
+
+
+class ProgressBoard:
+    """
+    ProgressBoard is a table of progress counters in shared memory with one slot per worker process.
+    Workers write their counters directly to shared memory and reader polls them, so reporting of progress doesn't send
+    any messages between processes. Board may be passed to worker processes (for example as task argument): it's
+    pickled as shared memory name and attached on unpickling
+    """
+    def __init__(self, slots_num: int, name: str = None):
+        """
+        ProgressBoard constructor
+        :param slots_num: number of slots
+        :param name: name of existing board shared memory to attach. New board is created if None
+        """
+        self.__slots_num = slots_num
+        self.__is_owner = name is None
+        if self.__is_owner:
+            self.__memory = shared_memory.SharedMemory(create=True, size=slots_num * 2 * 8)
+        else:
+            try:
+                self.__memory = shared_memory.SharedMemory(name=name, track=False)
+            except TypeError:
+                self.__memory = shared_memory.SharedMemory(name=name)
+        self.__values = self.__memory.buf.cast('d')
+        self.__is_closed = False
+        if self.__is_owner:
+            for i in range(slots_num * 2):
+                self.__values[i] = 0
+
+    def get_name(self):
+        return self.__memory.name
+
+    def get_slots_num(self):
+        return self.__slots_num
+
+    def update(self, slot: int, done: float, total: float = None):
+        """
+        Update progress of slot
+        :param slot: slot index
+        :param done: number of done items
+        :param total: total number of items. Previous value is kept if None
+        """
+        if total is not None:
+            self.__values[slot * 2 + 1] = total
+        self.__values[slot * 2] = done
+
+    def get(self, slot: int):
+        """
+        Get progress of slot
+        :return: done and total numbers of items
+        """
+        return self.__values[slot * 2], self.__values[slot * 2 + 1]
+
+    def get_all(self):
+        """
+        Get progress of all slots
+        :return: list of (done, total) for every slot
+        """
+        values = self.__values.tolist()
+        return list(zip(values[0::2], values[1::2]))
+
+    def get_overall(self):
+        """
+        Get sum progress of all slots
+        :return: done and total numbers of items
+        """
+        values = self.__values.tolist()
+        return sum(values[0::2]), sum(values[1::2])
+
+    def close(self):
+        """
+        Close board. Shared memory is released by board, that created it
+        """
+        if self.__is_closed:
+            return
+        self.__is_closed = True
+        # view of shared memory must be released before closing, otherwise close raises BufferError
+        self.__values.release()
+        self.__memory.close()
+        if self.__is_owner:
+            self.__memory.unlink()
+
+    def __del__(self):
+        if not getattr(self, '_ProgressBoard__is_closed', True):
+            self.close()
+
+    def __reduce__(self):
+        return _attach_progress_board, (self.__slots_num, self.__memory.name)
+
+
+_attached_boards = weakref.WeakValueDictionary()
+
+
+def _attach_progress_board(slots_num: int, name: str):
+    # board is attached once per process while it's referenced, so unpickling of it for every task doesn't map
+    # shared memory again
+    board = _attached_boards.get(name)
+    if board is None:
+        board = ProgressBoard(slots_num, name)
+        _attached_boards[name] = board
+    return board
@@ -1,17 +1,36 @@
-import math
+import importlib
+import itertools
 import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
 
-from PySide2.QtOpenGL import QGLWidget
 from PySide2.QtWidgets import QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QCheckBox, QRadioButton, \
-    QComboBox, QProgressBar, QTableWidget, QHeaderView, QTableWidgetItem, QFileDialog, QToolButton, QTabWidget, \
-    QWidget, QListWidget, QListWidgetItem, QGroupBox, QStackedLayout, QSplitter, QGraphicsView, QGraphicsScene
-from PySide2.QtGui import QPixmap, QImage, QDoubleValidator, QIntValidator, QRegExpValidator, QPainterPath
-from PySide2.QtCore import QObject, Signal, QDir, Qt, QRectF
+    QComboBox, QProgressBar, QFileDialog, QToolButton, QTabWidget, QWidget, QGroupBox, QStackedLayout, QSplitter, \
+    QListView
+from PySide2.QtGui import QDoubleValidator, QIntValidator, QRegExpValidator
+from PySide2.QtCore import QObject, Signal, QDir, Qt, QAbstractListModel, QModelIndex, QTimer
 from PySide2 import QtCore
 
 from abc import ABCMeta, abstractmethod
 
 from .utils import StateSaver
+from .app import wrap_callback, ui_thread, submit
+
+# heavy widgets are placed to own modules and imported on first access
+_lazy_widgets = {'ImageLayout': 'image_layout', 'Table': 'table', 'OpenGLWidget': 'opengl'}
+
+__all__ = ['Checkable', 'Widget', 'LabeledWidget', 'ValueContains', 'LineEdit', 'Button', 'CheckBox', 'RadioButton',
+           'ComboBox', 'ProgressBar', 'PathDialog', 'OpenFile', 'SaveFile', 'OpenDirectory', 'ListWidget',
+           'DynamicView'] + list(_lazy_widgets.keys())
+
+
+def __getattr__(name):
+    if name in _lazy_widgets:
+        module = importlib.import_module('.' + _lazy_widgets[name], __package__)
+        return getattr(module, name)
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
 
 
 class Checkable(metaclass=ABCMeta):
@@ -50,10 +69,48 @@ class Widget:
         self._state_saver = None
         self._layouts = [QVBoxLayout()]
         self._cur_tab_widget = None
+        self._cur_tab_handlers = None
         self._cur_splitter = None
+        self._state_group = None
+        self._layouts_state_groups = []
+        self._stored_keys = []
 
-    def set_state_saver(self, saver: StateSaver):
+    def set_state_saver(self, saver: StateSaver, group=None):
+        """
+        Set StateSaver for storing states of widgets, that added by add_widget
+        :param saver: StateSaver
+        :param group: group of stored widgets in StateSaver. States of group widgets are restored by
+        StateSaver.restore_group
+        :return: self instance
+        """
         self._state_saver = saver
+        self._state_group = group
+        return self
+
+    def _set_state_group(self, group):
+        """
+        Move all stored widgets to group of StateSaver
+        :param group: group
+        """
+        self._state_group = group
+        if self._state_saver is not None:
+            self._state_saver.set_group(self._stored_keys, group)
+
+    def _remove_stored_widgets(self):
+        """
+        Remove stored widgets from StateSaver before destroying of this widget
+        """
+        if self._state_saver is not None:
+            for key in self._stored_keys:
+                self._state_saver.remove_widget(key)
+        self._stored_keys = []
+
+    def _get_state_group(self):
+        for layout in reversed(self._layouts):
+            for l, group in self._layouts_state_groups:
+                if l is layout:
+                    return group
+        return self._state_group
 
     def get_layout(self):
         """
@@ -94,12 +151,13 @@ class Widget:
         self._enabled_dependencies.append(dependency)
         dependency.add_clicked_callback(self.set_enabled)
 
-    def add_widget(self, widget: "Widget instance", need_store=False, need_stretch=True):
+    def add_widget(self, widget: "Widget instance", need_store=False, need_stretch=True, key: str = None):
         """
         Add widget to window layout
         :param widget: Widget unit
         :param need_store: is need to store state  of specified widget
         :param need_stretch: is need to insert stretch around widget
+        :param key: stable key of widget state in StateSaver. Index of stored widget is used by default
         :return: widget instance
         """
         if need_stretch:
@@ -109,7 +167,7 @@ class Widget:
             self.get_current_layout().addStretch()
 
         if need_store and self._state_saver is not None:
-            self._state_saver.add_widget(widget)
+            self._stored_keys.append(self._state_saver.add_widget(widget, key, self._get_state_group()))
 
         return widget
 
@@ -213,20 +271,140 @@ class Widget:
         del self._layouts[-1]
 
     def insert_text_label(self, text, is_link=False):
+        """
+        Insert text label
+        :param text: label text
+        :param is_link: is need to open links from text
+        :return: label, that may be used for text changing
+        :rtype: QLabel
+        """
         widget = QLabel(text)
         widget.setOpenExternalLinks(is_link)
         self.get_current_layout().addWidget(widget)
+        return widget
 
     def insert_tab_space(self):
         self._cur_tab_widget = QTabWidget()
         self.get_current_layout().addWidget(self._cur_tab_widget)
 
+        # handlers, that called when tab becomes current
+        handlers = []
+        self._cur_tab_handlers = handlers
+        self._cur_tab_widget.currentChanged.connect(lambda idx: handlers[idx]() if 0 <= idx < len(handlers) else None)
+
     def add_tab(self, name):
-        self._layouts.append(QVBoxLayout())
+        """
+        Add tab to current tab space. States of stored widgets of tab, except first, are restored when tab becomes
+        current first time
+        :param name: tab name
+        """
+        layout = QVBoxLayout()
+        if self._cur_tab_widget.count() == 0:
+            # first tab is visible with tab space
+            self._cur_tab_handlers.append(lambda: None)
+            group = self._get_state_group()
+        else:
+            group = object()
+            self._cur_tab_handlers.append(lambda: self.__restore_group(group))
+        self._layouts_state_groups.append((layout, group))
+
+        self._layouts.append(layout)
         widget = QWidget()
         widget.setLayout(self.get_current_layout())
         self._cur_tab_widget.addTab(widget, name)
 
+    def add_tab_lazy(self, name, build_fn: callable, prebuild: bool = False):
+        """
+        Add tab to current tab space, that is built when it becomes current first time. Widgets of built page are
+        registered in StateSaver at build time, so stored widgets of page need stable keys
+        :param name: tab name
+        :param build_fn: function without arguments, that return Widget with page content
+        :param prebuild: is need to build page in background, when application is idle
+        """
+        widget = QWidget()
+        page = _LazyPage(widget, build_fn)
+        self._cur_tab_handlers.append(page.build)
+        self._cur_tab_widget.addTab(widget, name)
+        if prebuild:
+            page.prebuild()
+
+    def __restore_group(self, group):
+        if self._state_saver is not None:
+            self._state_saver.restore_group(group)
+
+
+class _LazyPage:
+    """
+    Page, that is built by factory on first show. Pages may be prebuilt by queue, that builds one page per timer tick
+    """
+
+    PREBUILD_INTERVAL = 50
+
+    _prebuild_queue = deque()
+    _prebuild_timer = None
+
+    def __init__(self, widget: QWidget, build_fn: callable):
+        self.__layout = QVBoxLayout()
+        self.__layout.setContentsMargins(0, 0, 0, 0)
+        widget.setLayout(self.__layout)
+        self.__build_fn = build_fn
+        self.__item = None
+        self.__is_removed = False
+
+    def build(self):
+        """
+        Build page if it isn't built yet
+        :return: page content Widget or None if page is removed before building
+        """
+        if self.__item is None and not self.__is_removed:
+            self.__item = self.__build_fn()
+            self.__layout.addLayout(self.__item.get_layout())
+        return self.__item
+
+    def is_built(self):
+        return self.__item is not None
+
+    def get_item(self):
+        """
+        Get page content Widget
+        :return: Widget or None if page isn't built yet
+        """
+        return self.__item
+
+    def remove(self):
+        """
+        Mark page as removed, so it's never built: Qt widget of page is deleted. Page is dropped from prebuild queue
+        """
+        self.__is_removed = True
+        try:
+            _LazyPage._prebuild_queue.remove(self)
+        except ValueError:
+            pass
+
+    def prebuild(self):
+        """
+        Add page to prebuild queue
+        """
+        if self.__is_removed:
+            return
+        _LazyPage._prebuild_queue.append(self)
+        if _LazyPage._prebuild_timer is None:
+            _LazyPage._prebuild_timer = QTimer()
+            _LazyPage._prebuild_timer.timeout.connect(_LazyPage.__prebuild_next)
+        if not _LazyPage._prebuild_timer.isActive():
+            _LazyPage._prebuild_timer.start(self.PREBUILD_INTERVAL)
+
+    @staticmethod
+    def __prebuild_next():
+        while len(_LazyPage._prebuild_queue) > 0:
+            page = _LazyPage._prebuild_queue.popleft()
+            if not page.is_built():
+                page.build()
+                break
+
+        if len(_LazyPage._prebuild_queue) < 1:
+            _LazyPage._prebuild_timer.stop()
+
 
 class LabeledWidget(Widget, metaclass=ABCMeta):
     def __init__(self, instance: QObject = None):
@@ -332,6 +510,7 @@ class LineEdit(LabeledWidget, ValueContains):
 
         return self
 
+    @ui_thread(collapse=True)
     def set_value(self, value: str):
         """
         Set value to
@@ -348,7 +527,7 @@ class LineEdit(LabeledWidget, ValueContains):
         return self._instance.text()
 
     def set_value_changed_callback(self, callback: callable):
-        self._instance.textChanged.connect(callback)
+        self._instance.textChanged.connect(wrap_callback(callback))
         return self
 
     def _assembly(self):
@@ -364,203 +543,28 @@ class Button(Widget):
     def set_on_click_callback(self, callback: callable):
         """
         Set callback on click event
-        :param callback:
+        :param callback: function or coroutine function. Coroutine is run in asyncio event loop, that is driven by Qt
         :return:
         """
-        self._instance.clicked.connect(callback)
-        return self
-
-
-class ImageLayout(Widget):
-    class QtImageViewer(QGraphicsView):
-        """ PyQt image viewer widget for a QPixmap in a QGraphicsView scene with mouse zooming and panning.
-        Displays a QImage or QPixmap (QImage is internally converted to a QPixmap).
-        To display any other image format, you must first convert it to a QImage or QPixmap.
-        Some useful image format conversion utilities:
-            qimage2ndarray: NumPy ndarray <==> QImage    (https://github.com/hmeine/qimage2ndarray)
-            ImageQt: PIL Image <==> QImage  (https://github.com/python-pillow/Pillow/blob/master/PIL/ImageQt.py)
-        Mouse interaction:
-            Left mouse button drag: Pan image.
-            Right mouse button drag: Zoom box.
-            Right mouse button doubleclick: Zoom to show entire image.
-        """
-
-        # Mouse button signals emit image scene (x, y) coordinates.
-        # !!! For image (row, column) matrix indexing, row = y and column = x.
-        leftMouseButtonPressed = Signal(float, float)
-        rightMouseButtonPressed = Signal(float, float)
-        leftMouseButtonReleased = Signal(float, float)
-        rightMouseButtonReleased = Signal(float, float)
-        leftMouseButtonDoubleClicked = Signal(float, float)
-        rightMouseButtonDoubleClicked = Signal(float, float)
-
-        def __init__(self):
-            QGraphicsView.__init__(self)
-
-            # Image is displayed as a QPixmap in a QGraphicsScene attached to this QGraphicsView.
-            self.scene = QGraphicsScene()
-            self.setScene(self.scene)
-
-            # Store a local handle to the scene's current image pixmap.
-            self._pixmapHandle = None
-
-            # Image aspect ratio mode.
-            # !!! ONLY applies to full image. Aspect ratio is always ignored when zooming.
-            #   Qt.IgnoreAspectRatio: Scale image to fit viewport.
-            #   Qt.KeepAspectRatio: Scale image to fit inside viewport, preserving aspect ratio.
-            #   Qt.KeepAspectRatioByExpanding: Scale image to fill the viewport, preserving aspect ratio.
-            self.aspectRatioMode = Qt.KeepAspectRatio
-
-            # Scroll bar behaviour.
-            #   Qt.ScrollBarAlwaysOff: Never shows a scroll bar.
-            #   Qt.ScrollBarAlwaysOn: Always shows a scroll bar.
-            #   Qt.ScrollBarAsNeeded: Shows a scroll bar only when zoomed.
-            self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-            self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOn)
-
-            self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
-
-            # Stack of QRectF zoom boxes in scene coordinates.
-            self.zoomStack = []
-
-            # Flags for enabling/disabling mouse interaction.
-            self.canZoom = True
-            self.canPan = True
-
-        def hasImage(self):
-            """ Returns whether or not the scene contains an image pixmap.
-            """
-            return self._pixmapHandle is not None
-
-        def clearImage(self):
-            """ Removes the current image pixmap from the scene if it exists.
-            """
-            if self.hasImage():
-                self.scene.removeItem(self._pixmapHandle)
-                self._pixmapHandle = None
-
-        def pixmap(self):
-            """ Returns the scene's current image pixmap as a QPixmap, or else None if no image exists.
-            :rtype: QPixmap | None
-            """
-            if self.hasImage():
-                return self._pixmapHandle.pixmap()
-            return None
-
-        def image(self):
-            """ Returns the scene's current image pixmap as a QImage, or else None if no image exists.
-            :rtype: QImage | None
-            """
-            if self.hasImage():
-                return self._pixmapHandle.pixmap().toImage()
-            return None
-
-        def setImage(self, image):
-            """ Set the scene's current image pixmap to the input QImage or QPixmap.
-            Raises a RuntimeError if the input image has type other than QImage or QPixmap.
-            :type image: QImage | QPixmap
-            """
-            if type(image) is QPixmap:
-                pixmap = image
-            elif type(image) is QImage:
-                pixmap = QPixmap.fromImage(image)
-            else:
-                raise RuntimeError("ImageViewer.setImage: Argument must be a QImage or QPixmap.")
-            if self.hasImage():
-                self._pixmapHandle.setPixmap(pixmap)
-            else:
-                self._pixmapHandle = self.scene.addPixmap(pixmap)
-            self.setSceneRect(QRectF(pixmap.rect()))  # Set scene size to image size.
-            self.updateViewer()
-
-        def loadImageFromFile(self, fileName):
-            """ Load an image from file.
-            Without any arguments, loadImageFromFile() will popup a file dialog to choose the image file.
-            With a fileName argument, loadImageFromFile(fileName) will attempt to load the specified image file directly.
-            """
-            if len(fileName) and os.path.isfile(fileName):
-                image = QImage(fileName)
-                self.setImage(image)
-
-        def updateViewer(self):
-            """ Show current zoom (if showing entire image, apply current aspect ratio mode).
-            """
-            if not self.hasImage():
-                return
-            if len(self.zoomStack) and self.sceneRect().contains(self.zoomStack[-1]):
-                self.fitInView(self.zoomStack[-1], Qt.IgnoreAspectRatio)  # Show zoomed rect (ignore aspect ratio).
-            else:
-                self.zoomStack = []  # Clear the zoom stack (in case we got here because of an invalid zoom).
-                self.fitInView(self.sceneRect(), self.aspectRatioMode)  # Show entire image (use current aspect ratio mode).
-
-        def resizeEvent(self, event):
-            """ Maintain current zoom on resize.
-            """
-            self.updateViewer()
-
-        def wheelEvent(self, event):
-            scale_factor = 1.1
-
-            if event.delta() > 0:
-                self.scale(scale_factor, scale_factor)
-            else:
-                self.scale(1 / scale_factor, 1 / scale_factor)
-
-        def mousePressEvent(self, event):
-            """ Start mouse pan or zoom mode.
-            """
-            scenePos = self.mapToScene(event.pos())
-            if event.button() == Qt.LeftButton:
-                if self.canPan:
-                    self.setDragMode(QGraphicsView.ScrollHandDrag)
-                self.leftMouseButtonPressed.emit(scenePos.x(), scenePos.y())
-            QGraphicsView.mousePressEvent(self, event)
-
-        def mouseReleaseEvent(self, event):
-            """ Stop mouse pan or zoom mode (apply zoom if valid).
-            """
-            QGraphicsView.mouseReleaseEvent(self, event)
-            scenePos = self.mapToScene(event.pos())
-            if event.button() == Qt.LeftButton:
-                self.setDragMode(QGraphicsView.NoDrag)
-                self.leftMouseButtonReleased.emit(scenePos.x(), scenePos.y())
-
-        def mouseDoubleClickEvent(self, event):
-            """ Show entire image.
-            """
-            scenePos = self.mapToScene(event.pos())
-            if event.button() == Qt.LeftButton:
-                self.leftMouseButtonDoubleClicked.emit(scenePos.x(), scenePos.y())
-            elif event.button() == Qt.RightButton:
-                if self.canZoom:
-                    self.zoomStack = []  # Clear zoom stack.
-                    self.updateViewer()
-                self.rightMouseButtonDoubleClicked.emit(scenePos.x(), scenePos.y())
-
-            QGraphicsView.mouseDoubleClickEvent(self, event)
-
-    def __init__(self):
-        super().__init__(self.QtImageViewer())
-        self._layout.addWidget(self._instance)
-
-    def set_image_from_data(self, image, width, height, bytes_per_line):
-        img = QImage(image, width, height, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(img)
-        self._instance.setImage(pixmap)
+        self._instance.clicked.connect(wrap_callback(callback))
         return self
 
-    def set_image_from_file(self, file_path: str):
-        self._instance.setPixmap(file_path)
-        return self
-
-    def set_size(self, width, height):
-        # self.__pixmap = self.__pixmap.scaledToWidth(width).scaledToHeight(height)
-        # self._instance.setPixmap(self.__pixmap)
+    def set_on_click_task(self, fn: callable, *args, on_done: callable = None, on_error: callable = None,
+                          executor: str = 'thread', **kwargs):
+        """
+        Run function in shared pool of workers on click. Button is disabled while task is running
+        :param fn: function
+        :param args: function arguments
+        :param on_done: callback on_done(result), that called in UI thread after function finished
+        :param on_error: callback on_error(exception), that called in UI thread if function raise exception
+        :param executor: type of executor: 'thread' or 'process'
+        :param kwargs: function keyword arguments
+        :return: self instance
+        """
+        self._instance.clicked.connect(lambda: submit(fn, *args, on_done=on_done, on_error=on_error, executor=executor,
+                                                      disable=self, **kwargs))
         return self
 
-    def get_size(self):
-        return 0, 0  # self.__pixmap.width(), self.__pixmap.height()
-
 
 class CheckBox(Widget, Checkable):
     def __init__(self, title: str):
@@ -568,9 +572,10 @@ class CheckBox(Widget, Checkable):
         self._layout.addWidget(self._instance)
 
     def add_clicked_callback(self, callback: callable):
-        self._instance.toggled.connect(callback)
+        self._instance.toggled.connect(wrap_callback(callback))
         return self
 
+    @ui_thread(collapse=True)
     def set_value(self, state: bool):
         self._instance.setChecked(state)
         return self
@@ -584,6 +589,7 @@ class RadioButton(Widget, Checkable):
         super().__init__(QRadioButton(title))
         self._layout.addWidget(self._instance)
 
+    @ui_thread(collapse=True)
     def set_value(self, state: bool):
         self._instance.setChecked(state)
         return self
@@ -592,7 +598,7 @@ class RadioButton(Widget, Checkable):
         return self._instance.isChecked()
 
     def add_clicked_callback(self, callback: callable):
-        self._instance.toggled.connect(callback)
+        self._instance.toggled.connect(wrap_callback(callback))
         return self
 
 
@@ -614,6 +620,7 @@ class ComboBox(LabeledWidget, ValueContains):
 
         return self
 
+    @ui_thread(collapse=True)
     def set_value(self, value: int):
         self._instance.setCurrentIndex(value)
 
@@ -621,7 +628,7 @@ class ComboBox(LabeledWidget, ValueContains):
         return self._instance.currentIndex()
 
     def set_value_changed_callback(self, callback: callable):
-        self._instance.currentIndexChanged.connect(callback)
+        self._instance.currentIndexChanged.connect(wrap_callback(callback))
         return self
 
 
@@ -635,7 +642,12 @@ class ProgressBar(Widget, ValueContains):
         def set_value(self, value: int, status: str = ""):
             self.value_changed.emit(value, status)
 
-    def __init__(self):
+    def __init__(self, update_rate: int = None):
+        """
+        ProgressBar constructor
+        :param update_rate: maximum number of progress bar updates per second. If specified, set_value only store the
+        latest value, that is shown by timer with this rate. Throughput and ETA are shown in status in this mode
+        """
         super().__init__(QProgressBar())
         self._layout.addWidget(self._instance)
 
@@ -645,43 +657,66 @@ class ProgressBar(Widget, ValueContains):
         self.__InstanceCls = self.Instance()
         self.__InstanceCls.value_changed.connect(self.__set_value)
 
+        self.__latest_value = None
+        self.__shown_value = None
+        self.__rate, self.__prev_sample = None, None
+        self.__timer = None
+        if update_rate is not None:
+            self.__timer = QTimer(self._instance)
+            self.__timer.timeout.connect(self.__show_latest_value)
+            self.__timer.start(max(int(1000 / update_rate), 1))
+
     def set_value(self, value: int, status: str = ""):
-        self.__InstanceCls.value_changed.emit(value, status)
+        """
+        Set progress value. Thread safe
+        :param value: progress value
+        :param status: status text
+        """
+        if self.__timer is not None:
+            self.__latest_value = (value, status)
+        else:
+            self.__InstanceCls.value_changed.emit(value, status)
+
+    def set_maximum(self, maximum: int):
+        """
+        Set maximum progress value (100 by default)
+        :return: self instance
+        """
+        self._instance.setMaximum(maximum)
+        return self
 
     def get_value(self):
-        return self._instance.getValue()
+        return self._instance.value()
 
     def set_value_changed_callback(self, callback: callable):
-        self._instance.valueChanged.connect(callback)
+        self._instance.valueChanged.connect(wrap_callback(callback))
         return self
 
     def __set_value(self, value: int, status: str = ""):
         self._instance.setValue(value)
         self.__status.setText(status)
 
+    def __show_latest_value(self):
+        latest = self.__latest_value
+        if latest is None or latest is self.__shown_value:
+            return
+        self.__shown_value = latest
+        value, status = latest
 
-class Table(Widget):
-    def __init__(self):
-        super().__init__(QTableWidget())
-        self._instance.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self._layout.addWidget(self._instance)
-
-    def add_row(self, items: []):
-        row_idx = self._instance.rowCount()
-        self._instance.setRowCount(row_idx + 1)
-        for i, item in enumerate(items):
-            self._instance.setItem(row_idx, i, QTableWidgetItem(item))
-        return self
-
-    def del_row(self):
-        current_row = self._instance.currentRow()
-        self._instance.removeRow(current_row)
-        return self
+        now = time.perf_counter()
+        if self.__prev_sample is None or value < self.__prev_sample[1]:
+            self.__rate, self.__prev_sample = None, (now, value)
+        elif value > self.__prev_sample[1]:
+            prev_time, prev_value = self.__prev_sample
+            cur_rate = (value - prev_value) / max(now - prev_time, 1e-6)
+            self.__rate = cur_rate if self.__rate is None else 0.7 * self.__rate + 0.3 * cur_rate
+            self.__prev_sample = (now, value)
 
-    def set_columns_headers(self, headers: []):
-        self._instance.setColumnCount(len(headers))
-        self._instance.setHorizontalHeaderLabels(headers)
-        return self
+        if self.__rate is not None and self.__rate > 0:
+            eta = int(max(self._instance.maximum() - value, 0) / self.__rate)
+            status = "{}{}{:.1f} it/s, ETA {}:{:02d}:{:02d}".format(status, " | " if len(status) > 0 else "",
+                                                                  self.__rate, eta // 3600, eta // 60 % 60, eta % 60)
+        self.__set_value(value, status)
 
 
 class PathDialog(Widget, ValueContains, metaclass=ABCMeta):
@@ -716,7 +751,7 @@ class PathDialog(Widget, ValueContains, metaclass=ABCMeta):
             c(value)
 
     def set_value_changed_callback(self, callback: callable):
-        self.__value_changed_callbacks.append(callback)
+        self.__value_changed_callbacks.append(wrap_callback(callback))
         return self
 
     def _update_value(self) -> None:
@@ -798,58 +833,332 @@ class OpenDirectory(PathDialog):
 
 
 class ListWidget(Widget, ValueContains):
+    class Model(QAbstractListModel):
+        """
+        List model over plain list of strings. Index of item is it's row in model, so lookups don't depend on list size
+        """
+
+        def __init__(self, parent=None):
+            super().__init__(parent)
+            self._items = []
+            self._is_editable = []
+
+        def insert_items(self, items: [str], is_editable: bool = True):
+            """
+            Append items to the end of list by one insert notification
+            """
+            items = [str(i) for i in items]
+            if len(items) < 1:
+                return
+            self.beginInsertRows(QModelIndex(), len(self._items), len(self._items) + len(items) - 1)
+            self._items.extend(items)
+            self._is_editable.extend([is_editable] * len(items))
+            self.endInsertRows()
+
+        def remove_items(self, indices: [int]):
+            """
+            Remove items by indices. Contiguous range removed by one remove notification, another indices - by model reset
+            """
+            indices = sorted(set(i for i in indices if 0 <= i < len(self._items)))
+            if len(indices) < 1:
+                return
+
+            if indices[-1] - indices[0] + 1 == len(indices):
+                self.beginRemoveRows(QModelIndex(), indices[0], indices[-1])
+                del self._items[indices[0]: indices[-1] + 1]
+                del self._is_editable[indices[0]: indices[-1] + 1]
+                self.endRemoveRows()
+                return
+
+            self.beginResetModel()
+            removed = set(indices)
+            self._items = [it for i, it in enumerate(self._items) if i not in removed]
+            self._is_editable = [e for i, e in enumerate(self._is_editable) if i not in removed]
+            self.endResetModel()
+
+        def clear(self):
+            self.beginResetModel()
+            self._items, self._is_editable = [], []
+            self.endResetModel()
+
+        def get_item(self, idx: int):
+            return self._items[idx]
+
+        def rowCount(self, parent=QModelIndex()):
+            return 0 if parent.isValid() else len(self._items)
+
+        def data(self, index, role=Qt.DisplayRole):
+            if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+                return None
+            return self._items[index.row()]
+
+        def setData(self, index, value, role=Qt.EditRole):
+            if not index.isValid() or role != Qt.EditRole:
+                return False
+            self._items[index.row()] = str(value)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+            return True
+
+        def flags(self, index):
+            if not index.isValid():
+                return Qt.NoItemFlags
+            flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable
+            return flags | Qt.ItemIsEditable if self._is_editable[index.row()] else flags
+
+    class PagedModel(QAbstractListModel):
+        """
+        List model, that lazily pulls items by pages from data source.
+        Supported data sources:
+            iterable or iterator. Pages are pulled by canFetchMore/fetchMore, when view is scrolled to the end of list.
+            All pulled items are kept, because iterator can't be rewound
+            callable fetch(offset, limit), that return list of not more than limit items. Pages are stored in LRU cache
+            and fetched again after eviction. If items number is known, list has it's full size from start and
+            rows, that don't loaded yet, are shown as placeholders
+        """
+
+        page_loaded = Signal(int, list)
+
+        def __init__(self, source, page_size: int = 100, cache_pages_num: int = 50, items_num: int = None,
+                     is_threaded: bool = False, placeholder: str = "...", parent=None):
+            super().__init__(parent)
+            self._fetch = source if callable(source) else None
+            self._iterator = None if callable(source) else iter(source)
+            self._page_size = page_size
+            self._cache_pages_num = cache_pages_num
+            self._placeholder = placeholder
+
+            self._pages = OrderedDict()
+            self._items = []
+            self._rows_num = 0 if items_num is None or self._fetch is None else items_num
+            self._is_exhausted = self._fetch is not None and items_num is not None
+            self._pending_pages = set()
+
+            self.page_loaded.connect(self.__on_page_loaded)
+            self._requests = None
+            if is_threaded:
+                self._requests = queue.Queue()
+                threading.Thread(target=self.__process_requests, daemon=True).start()
+
+        def close(self):
+            """
+            Stop fetching thread
+            """
+            if self._requests is not None:
+                self._requests.put(None)
+
+        def get_item(self, idx: int):
+            return self.data(self.index(idx, 0))
+
+        def rowCount(self, parent=QModelIndex()):
+            if parent.isValid():
+                return 0
+            return len(self._items) if self._iterator is not None else self._rows_num
+
+        def canFetchMore(self, parent=QModelIndex()):
+            return not parent.isValid() and not self._is_exhausted and self.__next_page_idx() not in self._pending_pages
+
+        def fetchMore(self, parent=QModelIndex()):
+            if self.canFetchMore(parent):
+                self.__request_page(self.__next_page_idx())
+
+        def data(self, index, role=Qt.DisplayRole):
+            if not index.isValid() or role != Qt.DisplayRole:
+                return None
+            row = index.row()
+            if self._iterator is not None:
+                return self._items[row]
+
+            page_idx, offset = divmod(row, self._page_size)
+            items = self._pages.get(page_idx)
+            if items is None:
+                if self._requests is not None:
+                    self.__request_page(page_idx)
+                    return self._placeholder
+                items = self.__load_page(page_idx)
+                self.__store_page(page_idx, items)
+            else:
+                self._pages.move_to_end(page_idx)
+            return str(items[offset]) if offset < len(items) else self._placeholder
+
+        def __next_page_idx(self):
+            return -1 if self._iterator is not None else self._rows_num // self._page_size
+
+        def __request_page(self, page_idx: int):
+            if page_idx in self._pending_pages:
+                return
+            self._pending_pages.add(page_idx)
+            if self._requests is not None:
+                self._requests.put(page_idx)
+            else:
+                self.__on_page_loaded(page_idx, self.__load_page(page_idx))
+
+        def __load_page(self, page_idx: int):
+            if self._iterator is not None:
+                return [str(i) for i in itertools.islice(self._iterator, self._page_size)]
+            return list(self._fetch(page_idx * self._page_size, self._page_size))
+
+        def __process_requests(self):
+            while True:
+                page_idx = self._requests.get()
+                if page_idx is None:
+                    return
+                self.page_loaded.emit(page_idx, self.__load_page(page_idx))
+
+        def __store_page(self, page_idx: int, items: list):
+            self._pages[page_idx] = items
+            self._pages.move_to_end(page_idx)
+            while len(self._pages) > self._cache_pages_num:
+                self._pages.popitem(last=False)
+
+        def __on_page_loaded(self, page_idx: int, items: list):
+            self._pending_pages.discard(page_idx)
+
+            if self._iterator is not None:
+                if len(items) > 0:
+                    self.beginInsertRows(QModelIndex(), len(self._items), len(self._items) + len(items) - 1)
+                    self._items.extend(items)
+                    self.endInsertRows()
+                self._is_exhausted = len(items) < self._page_size
+                return
+
+            self.__store_page(page_idx, items)
+            first_row = page_idx * self._page_size
+            if not self._is_exhausted and first_row >= self._rows_num:
+                if len(items) > 0:
+                    self.beginInsertRows(QModelIndex(), self._rows_num, self._rows_num + len(items) - 1)
+                    self._rows_num += len(items)
+                    self.endInsertRows()
+                self._is_exhausted = len(items) < self._page_size
+            elif len(items) > 0:
+                last_row = min(first_row + len(items), self._rows_num) - 1
+                self.dataChanged.emit(self.index(first_row, 0), self.index(last_row, 0), [Qt.DisplayRole])
+
     def __init__(self):
-        super().__init__(QListWidget())
+        super().__init__(QListView())
         self._layout.addWidget(self._instance)
-        self.__items = []
+        self._instance.setUniformItemSizes(True)
+
+        self.__value_changed_callbacks = []
+        self.__item_renamed_callbacks = []
+
+        self.__model = None
+        self.__set_model(self.Model(self._instance))
 
+    @ui_thread()
     def add_item(self, item: str, is_editable=True):
-        self.__items.append(QListWidgetItem(item, self._instance))
-        if is_editable:
-            self.__items[-1].setFlags(self.__items[-1].flags() | Qt.ItemIsEditable)
-        self._instance.addItem(self.__items[-1])
+        self.__get_items_model().insert_items([item], is_editable)
 
+    @ui_thread()
     def add_items(self, items: [str], is_editable=True) -> Widget:
-        for item in items:
-            self.add_item(item, is_editable)
+        self.__get_items_model().insert_items(items, is_editable)
         return self
 
+    @ui_thread()
     def remove_item(self, idx: int):
-        self._instance.takeItem(idx)
-        del self.__items[idx]
+        self.__get_items_model().remove_items([idx])
+
+    @ui_thread()
+    def remove_items(self, indices: [int]):
+        """
+        Remove items by indices
+        :param indices: indices of items
+        :return: self instance
+        """
+        self.__get_items_model().remove_items(indices)
+        return self
 
     def remove_current(self):
-        self.remove_item(self.get_current_idx())
+        idx = self.get_current_idx()
+        if idx is not None:
+            self.remove_item(idx)
 
     def get_current_idx(self):
-        return self.__get_item_idx(self._instance.currentItem())
+        index = self._instance.currentIndex()
+        return index.row() if index.isValid() else None
+
+    def get_item(self, idx: int):
+        return self.__model.get_item(idx)
+
+    def set_data_source(self, source, page_size: int = 100, cache_pages_num: int = 50, items_num: int = None,
+                        is_threaded: bool = False, placeholder: str = "..."):
+        """
+        Show items, that lazily pulled by pages from data source. Items can't be added, removed or renamed in this mode
+        :param source: iterable or callable fetch(offset, limit), that return list of items
+        :param page_size: number of items in page
+        :param cache_pages_num: maximum number of pages, that kept in memory for callable source
+        :param items_num: total number of items for callable source, if it's known
+        :param is_threaded: is need to fetch pages in background thread
+        :param placeholder: text of items, that don't fetched yet
+        :return: self instance
+        """
+        self.__close_data_source()
+        self.__set_model(self.PagedModel(source, page_size, cache_pages_num, items_num, is_threaded, placeholder,
+                                         self._instance))
+        return self
+
+    def reset_data_source(self):
+        """
+        Stop showing items from data source and return to empty list of own items
+        :return: self instance
+        """
+        self.__close_data_source()
+        self.__set_model(self.Model(self._instance))
+        return self
 
+    def get_items_num(self):
+        return self.__model.rowCount()
+
+    @ui_thread()
     def clear(self):
-        for i in range(len(self.__items)):
-            self.remove_item(i)
+        self.__get_items_model().clear()
 
     def set_value(self, value: int):
-        self._instance.setItem(self.__items[value])
+        self._instance.setCurrentIndex(self.__model.index(value, 0))
 
     def get_value(self):
-        return self.__items.index(self._instance.currentItem())
+        return self.get_current_idx()
 
     def set_value_changed_callback(self, callback: callable):
-        self._instance.currentItemChanged.connect(lambda cur, prev: callback(self.__get_item_idx(cur)))
+        self.__value_changed_callbacks.append(wrap_callback(callback))
         return self
 
     def set_item_renamed_callback(self, callback: callable):
-        def internal(item: QListWidgetItem):
-            idx = self.__get_item_idx(self._instance.currentItem())
-            callback(idx, item.text())
+        self.__item_renamed_callbacks.append(wrap_callback(callback))
+        return self
 
-        self._instance.itemChanged.connect(internal)
+    def __set_model(self, model: QAbstractListModel):
+        """
+        Set model, that provide items for list view
+        :param model: model instance
+        """
+        prev_model, self.__model = self.__model, model
+        self._instance.setModel(model)
+        self._instance.selectionModel().currentChanged.connect(self.__on_current_changed)
+        model.dataChanged.connect(self.__on_data_changed)
+        if prev_model is not None:
+            prev_model.deleteLater()
+
+    def __close_data_source(self):
+        if isinstance(self.__model, self.PagedModel):
+            self.__model.close()
+
+    def __get_items_model(self):
+        if not isinstance(self.__model, self.Model):
+            raise Exception("ListWidget items can't be changed while it is backed by data source")
+        return self.__model
+
+    def __on_current_changed(self, current, previous):
+        idx = current.row() if current.isValid() else None
+        for c in self.__value_changed_callbacks:
+            c(idx)
 
-    def __get_item_idx(self, item: QListWidgetItem):
-        for idx, it in enumerate(self.__items):
-            if it is item:
-                return idx
-        return None
+    def __on_data_changed(self, top_left, bottom_right, roles=None):
+        if len(self.__item_renamed_callbacks) < 1 or (roles is not None and len(roles) > 0 and Qt.EditRole not in roles):
+            return
+        for idx in range(top_left.row(), bottom_right.row() + 1):
+            text = self.__model.data(self.__model.index(idx, 0))
+            for c in self.__item_renamed_callbacks:
+                c(idx, text)
 
 
 class DynamicView(Widget):
@@ -857,75 +1166,145 @@ class DynamicView(Widget):
         super().__init__()
         self.__stacked_layout = QStackedLayout()
         self._layout.addLayout(self.__stacked_layout)
+        self.__stacked_layout.currentChanged.connect(self.__on_current_changed)
 
         self.__widgets = []
+        self.__items = []
+
+        self.__page_factory = None
+        self.__max_pages = None
+        self.__on_evict = None
+        self.__on_restore = None
+        self.__pages = OrderedDict()
+        self.__evicted_states = {}
+        self.__cache_stats = {'hits': 0, 'misses': 0, 'evicted': 0}
 
     def add_item(self, item: Widget):
+        """
+        Add page. States of stored widgets of page are restored when page becomes current first time
+        :param item: page widget
+        """
+        item._set_state_group(object())
+        self.__items.append(item)
+
         w = QWidget()
         w.setLayout(item.get_layout())
+        self.__widgets.append(w)
         self.__stacked_layout.addWidget(w)
+
+    def add_item_factory(self, build_fn: callable, prebuild: bool = False):
+        """
+        Add page, that is built when it becomes current first time. Widgets of built page are registered in StateSaver
+        at build time, so stored widgets of page need stable keys
+        :param build_fn: function without arguments, that return page Widget
+        :param prebuild: is need to build page in background, when application is idle
+        """
+        w = QWidget()
+        page = _LazyPage(w, build_fn)
+        self.__items.append(page)
         self.__widgets.append(w)
+        self.__stacked_layout.addWidget(w)
+        if prebuild:
+            page.prebuild()
 
     def remove_item(self, idx: int):
-        self.__stacked_layout.takeAt(idx)
+        item = self.__items[idx]
+        if isinstance(item, _LazyPage):
+            item.remove()
+            item = item.get_item()
+        if item is not None:
+            item._remove_stored_widgets()
+
+        w = self.__widgets[idx]
+        self.__stacked_layout.removeWidget(w)
+        w.deleteLater()
         del self.__widgets[idx]
+        del self.__items[idx]
 
     def clear(self):
-        for i in range(len(self.__widgets) - 1):
-            self.remove_item(i)
+        while len(self.__widgets) > 0:
+            self.remove_item(len(self.__widgets) - 1)
+        while len(self.__pages) > 0:
+            self.__evict_page()
+        self.__evicted_states = {}
 
     def set_index(self, idx: int):
-        self.__stacked_layout.setCurrentIndex(idx)
-
+        self.__stacked_layout.setCurrentWidget(self.__widgets[idx])
 
-class OpenGLWidget(Widget):
-    def __init__(self, init_callback: callable, resize_callback: callable, draw_callback: callable):
-        super().__init__(QGLWidget())
-        self._layout.addWidget(self._instance)
-
-        self._instance.initializeGL = init_callback
-        self._instance.resizeGL = resize_callback
-        self._instance.paintGL = draw_callback
-        self._instance.setFocusPolicy(Qt.StrongFocus)
-        self._key_buf = [False for _ in range(256)]
-
-    def set_mouse_move_callback(self, callback: callable):
-        def with_update(event):
-            callback(event.pos().x(), event.pos().y())
-            self._instance.updateGL()
-        self._instance.mouseMoveEvent = with_update
-
-    def set_mouse_press_callback(self, callback: callable):
-        self._instance.mousePressEvent = lambda event: callback(event.pos().x(), event.pos().y(), event.buttons() == Qt.LeftButton, True)
-        self._instance.mouseReleaseEvent = lambda event: callback(event.pos().x(), event.pos().y(), event.buttons() == Qt.LeftButton, False)
-
-    def set_wheel_scroll_event(self, callback: callable):
-        def with_update(event):
-            callback(1 if event.delta() > 0 else -1)
-            self._instance.updateGL()
-        self._instance.wheelEvent = lambda event: with_update(event)
-
-    def set_keyboard_event(self, callback: callable):
-        def get_code(event):
-            code = event.key() + 32
-
-            if code < 0 or code > 255:
-                return None
-            return code
+    def set_page_factory(self, factory: callable, max_pages: int = 10, on_evict: callable = None,
+                         on_restore: callable = None):
+        """
+        Enable cached mode: pages are built by factory for key by show_page call and only max_pages recently shown
+        pages are kept. Another pages are destroyed and rebuilt on demand
+        :param factory: function factory(key), that return page Widget
+        :param max_pages: maximum number of kept pages
+        :param on_evict: callback on_evict(key, item), that called before page destroying. It may return page state
+        :param on_restore: callback on_restore(key, item, state), that called after rebuilding of evicted page with
+        state, that was returned by on_evict
+        :return: self instance
+        """
+        self.clear()
+        self.__page_factory = factory
+        self.__max_pages = max_pages
+        self.__on_evict = on_evict
+        self.__on_restore = on_restore
+        return self
 
-        def on_press(event):
-            code = get_code(event)
-            if code is None:
-                return
-            self._key_buf[code] = True
-            callback(self._key_buf)
-            self._instance.updateGL()
+    def show_page(self, key):
+        """
+        Show page for key in cached mode. Page is built by factory if it isn't kept in cache
+        :param key: page key
+        :return: page Widget
+        """
+        if self.__page_factory is None:
+            raise Exception("Page factory isn't set. Call DynamicView.set_page_factory before DynamicView.show_page")
 
-        def on_release(event):
-            code = get_code(event)
-            if code is None:
-                return
-            self._key_buf[code] = False
+        if key in self.__pages:
+            self.__cache_stats['hits'] += 1
+            self.__pages.move_to_end(key)
+            item, w = self.__pages[key]
+        else:
+            self.__cache_stats['misses'] += 1
+            item = self.__page_factory(key)
+            w = QWidget()
+            w.setLayout(item.get_layout())
+            self.__pages[key] = (item, w)
+            self.__stacked_layout.addWidget(w)
+
+            if key in self.__evicted_states:
+                state = self.__evicted_states.pop(key)
+                if self.__on_restore is not None:
+                    self.__on_restore(key, item, state)
+
+        self.__stacked_layout.setCurrentWidget(w)
+        while len(self.__pages) > max(self.__max_pages, 1):
+            self.__evict_page()
+        return item
+
+    def get_cache_stats(self):
+        """
+        Get statistics of pages cache
+        :return: dict with number of cache hits, misses, evicted pages and number of kept pages
+        """
+        return dict(self.__cache_stats, resident=len(self.__pages))
+
+    def __evict_page(self):
+        key, (item, w) = self.__pages.popitem(last=False)
+        if self.__on_evict is not None:
+            self.__evicted_states[key] = self.__on_evict(key, item)
+        self.__cache_stats['evicted'] += 1
+        item._remove_stored_widgets()
+        self.__stacked_layout.removeWidget(w)
+        w.deleteLater()
+
+    def __on_current_changed(self, idx: int):
+        w = self.__stacked_layout.widget(idx)
+        idx = next((i for i, widget in enumerate(self.__widgets) if widget is w), None)
+        if idx is None:
+            return
 
-        self._instance.keyPressEvent = on_press
-        self._instance.keyReleaseEvent = on_release
+        item = self.__items[idx]
+        if isinstance(item, _LazyPage):
+            item = item.build()
+        if item._state_saver is not None:
+            item._state_saver.restore_group(item._state_group)
@@ -1,15 +1,122 @@
+import multiprocessing
+import queue
+import threading
+import weakref
 from abc import ABCMeta, abstractmethod
 
-from PySide2.QtCore import Qt
+from PySide2.QtCore import Qt, QTimer
 from PySide2.QtWidgets import QVBoxLayout, QHBoxLayout, QGroupBox, QDialog, QWidget, QLabel, QDockWidget, \
     QScrollArea, QMainWindow, QTabWidget
 
 from .widget import Widget, Button, ProgressBar
+from .utils import ProgressBoard
+
+
+class WindowPool:
+    """
+    Pool of built windows. Windows are grouped by key, that describes window shape (for example number of buttons).
+    Window is returned to pool, when it's closed, and reused by next acquire with the same key, so Qt objects of window
+    aren't rebuilt for every show
+    """
+
+    def __init__(self, max_free: int = 4):
+        """
+        WindowPool constructor
+        :param max_free: maximum number of free windows for every key. Excess closed windows are destroyed
+        """
+        self.__max_free = max_free
+        self.__free = {}
+        self.__built = {}
+
+    def acquire(self, key, build_fn: callable, parent=None):
+        """
+        Get free window for key or build new one
+        :param key: hashable key of window shape
+        :param build_fn: function without arguments, that build window
+        :param parent: parent Qt widget of windows. Windows of key are dropped from pool, when parent is destroyed
+        :return: window
+        :rtype: AbstractWindow
+        """
+        self.__watch_parent(key, parent)
+        free = self.__free.get(key)
+        window = free.pop() if free else self.__build(key, build_fn)
+        window._is_pool_acquired = True
+        return window
+
+    def release(self, key, window: "AbstractWindow"):
+        """
+        Return window to pool. Does nothing if window is already returned
+        :param key: key of window shape
+        :param window: window
+        """
+        if not window._is_pool_acquired:
+            return
+        window._is_pool_acquired = False
+        window._on_release()
+
+        free = self.__free.setdefault(key, [])
+        if len(free) < self.__max_free:
+            free.append(window)
+        else:
+            window.get_instance().deleteLater()
+
+    def prewarm(self, key, build_fn: callable, num: int = 1, parent=None):
+        """
+        Build windows for key beforehand, so first acquires doesn't build it
+        :param key: key of window shape
+        :param build_fn: function without arguments, that build window
+        :param num: number of free windows, that must be in pool
+        :param parent: parent Qt widget of windows. Windows of key are dropped from pool, when parent is destroyed
+        """
+        self.__watch_parent(key, parent)
+        free = self.__free.setdefault(key, [])
+        for _ in range(min(num, self.__max_free) - len(free)):
+            window = self.__build(key, build_fn)
+            window._is_pool_acquired = True
+            self.release(key, window)
+
+    def get_free_num(self, key=None):
+        """
+        Get number of free windows
+        :param key: key of window shape. Number of all free windows if None
+        """
+        if key is not None:
+            return len(self.__free.get(key, []))
+        return sum(len(f) for f in self.__free.values())
+
+    def __build(self, key, build_fn: callable):
+        window = build_fn()
+        window._keep_on_close_callbacks()
+        window._pool_release = lambda: self.release(key, window)
+        self.__built.setdefault(key, weakref.WeakSet()).add(window)
+        return window
+
+    def __watch_parent(self, key, parent):
+        if parent is None or key in self.__built:
+            return
+        self.__built[key] = weakref.WeakSet()
+        parent.destroyed.connect(lambda *args: self.__drop(key))
+
+    def __drop(self, key):
+        # windows are destroyed together with parent, so they must be never returned by pool
+        self.__free.pop(key, None)
+        for window in self.__built.pop(key, []):
+            window._pool_release = None
+            window._is_pool_acquired = False
+
+
+_windows_pool = WindowPool()
 
 
 class AbstractWindow(Widget, metaclass=ABCMeta):
+    # is window returned to pool by close event. Otherwise _show must return it
+    _is_released_on_close = True
+
     def __init__(self, title: str, instance: QWidget, enable_scrolling: bool = False):
         super().__init__(instance)
+        self._pool_release = None
+        self._is_pool_acquired = False
+        self.__subwindows_pool = None
 
         self._instance.closeEvent = lambda event: self.__on_close(event)
 
@@ -47,6 +154,7 @@ class AbstractWindow(Widget, metaclass=ABCMeta):
         self._instance.resize(0, 0)
 
         self.__on_close_callbacks = []
+        self.__kept_on_close_callbacks = []
 
     @abstractmethod
     def _show(self):
@@ -75,6 +183,32 @@ class AbstractWindow(Widget, metaclass=ABCMeta):
         if self._state_saver is not None:
             self._state_saver.write()
 
+        if self._is_released_on_close and self._pool_release is not None:
+            self._pool_release()
+
+    def _keep_on_close_callbacks(self):
+        """
+        Internal method, that called when window is built by pool. Close callbacks, that are already added (for example
+        by window constructor), are kept across pool usages
+        """
+        self.__kept_on_close_callbacks = list(self.__on_close_callbacks)
+
+    def _on_release(self):
+        """
+        Internal method, that called when window is returned to pool. Callbacks of previous usage are removed
+        """
+        self.__on_close_callbacks = list(self.__kept_on_close_callbacks)
+
+    def set_title(self, title: str):
+        """
+        Set window title
+        :param title: title
+        :return: self instance
+        """
+        self.__title = title
+        self._instance.setWindowTitle(self.__title)
+        return self
+
     def set_title_prefix(self, prefix: str):
         """
         Set window title prefix. If empty string: reset title to window title
@@ -92,6 +226,27 @@ class AbstractWindow(Widget, metaclass=ABCMeta):
         """
         return ModalWindow(title, self._instance) if is_modal else Window(title, self._instance)
 
+    def get_pooled_subwindow(self, key, title: str, build_fn: callable, is_modal=True):
+        """
+        Get subwindow from pool of this window subwindows. Subwindow is built only if there is no free subwindow for key
+        and returned to pool after close
+        :param key: hashable key of subwindow content
+        :param title: window title
+        :param build_fn: function build_fn(window), that fill new subwindow
+        :param is_modal: is subwindow modal
+        :return: window
+        @rtype Window
+        """
+        if self.__subwindows_pool is None:
+            self.__subwindows_pool = WindowPool()
+
+        def build():
+            window = self.add_subwindow(title, is_modal)
+            build_fn(window)
+            return window
+
+        return self.__subwindows_pool.acquire((key, is_modal), build).set_title(title)
+
     def resize(self, width, height):
         self._instance.resize(width, height)
 
@@ -113,12 +268,19 @@ class Window(AbstractWindow):
 
 
 class ModalWindow(AbstractWindow):
+    # close event comes while exec_ is still running, so window is returned to pool after exec_ only. Otherwise close
+    # callback may acquire the same window and exec_ it recursively
+    _is_released_on_close = False
+
     def __init__(self, title: str = "", parent=None):
         super().__init__(title, QDialog(parent))
         self._instance.setWindowFlags(self._instance.windowFlags() & (~Qt.WindowContextHelpButtonHint))
 
     def _show(self):
         self._instance.exec_()
+        # dialog may be closed without close event (by Esc for example)
+        if self._pool_release is not None:
+            self._pool_release()
 
 
 class MainWindow(AbstractWindow):
@@ -166,72 +328,439 @@ class MessageWindow(ModalWindow):
     def __init__(self, title: str, message: str = None, parent=None):
         super().__init__(title, parent=parent)
 
+        self.__label = None
         if message is not None:
-            self.insert_text_label(message)
+            self.__label = self.insert_text_label(message)
 
         self.__btn = self.add_widget(Button("Ok").set_on_click_callback(lambda: self.close()))
 
+    def set_message(self, message: str):
+        """
+        Set message text. Window must be created with message
+        :param message: message
+        :return: self instance
+        """
+        self.__label.setText(message)
+        self._instance.adjustSize()
+        return self
+
+    @classmethod
+    def pooled(cls, title: str, message: str = None, parent=None):
+        """
+        Get message window from pool. Window is returned to pool after close
+        :param title: window title
+        :param message: message
+        :param parent: parent Qt widget
+        :return: window
+        :rtype: MessageWindow
+        """
+        window = _windows_pool.acquire(cls.__pool_key(message is not None, parent),
+                                       lambda: cls(title, message, parent), parent)
+        window.set_title(title)
+        if message is not None:
+            window.set_message(message)
+        return window
+
+    @classmethod
+    def prewarm(cls, num: int = 1, has_message: bool = True, parent=None):
+        """
+        Build message windows for pool beforehand
+        :param num: number of windows
+        :param has_message: is windows with message
+        :param parent: parent Qt widget
+        """
+        _windows_pool.prewarm(cls.__pool_key(has_message, parent), lambda: cls("", "" if has_message else None, parent),
+                              num, parent)
+
+    @classmethod
+    def __pool_key(cls, has_message: bool, parent):
+        return cls, has_message, parent
+
 
 class DialogWindow(ModalWindow):
     def __init__(self, title: str, buttons: [str], message: str = None, parent=None):
         super().__init__(title, parent=parent)
 
+        self.__label = None
         if message is not None:
-            self.insert_text_label(message)
+            self.__label = self.insert_text_label(message)
 
         self.__layout = QVBoxLayout()
         self.__inner_layouts = [self.__layout]
         self.get_current_layout().addLayout(self.__layout)
 
         self.__choose = None
+        self.__names = list(buttons)
+        self.__buttons = []
         self.start_horizontal()
-        for button in buttons:
-            self.__add_method(button)
-            callback = getattr(self, button)
-            setattr(self, button, self.add_widget(Button(button)).set_on_click_callback(lambda: self.close()).set_on_click_callback(callback))
+        for i in range(len(buttons)):
+            button = self.add_widget(Button(buttons[i])).set_on_click_callback(lambda *args, idx=i: self.__on_button(idx))
+            self.__buttons.append(button)
         self.cancel()
 
         self.get_current_layout = lambda: self.__inner_layouts[-1]
 
     def show(self):
+        """
+        Show dialog
+        :return: name of clicked button or None if dialog closed without choice
+        """
+        self.__choose = None
         super().show()
         return self.__choose
 
-    def __add_method(self, rvalue):
-        def innerdynamo():
-            self.__choose = rvalue
+    def get_button(self, name: str):
+        """
+        Get button by name
+        :param name: button name
+        :return: button
+        :rtype: Button
+        """
+        return self.__buttons[self.__names.index(name)]
 
-        innerdynamo.__name__ = rvalue
-        setattr(self, innerdynamo.__name__, innerdynamo)
+    def set_message(self, message: str):
+        """
+        Set message text. Window must be created with message
+        :param message: message
+        :return: self instance
+        """
+        self.__label.setText(message)
+        self._instance.adjustSize()
+        return self
+
+    def set_buttons(self, buttons: [str]):
+        """
+        Rename buttons. Number of buttons can't be changed
+        :param buttons: buttons names
+        :return: self instance
+        """
+        if len(buttons) != len(self.__buttons):
+            raise Exception("DialogWindow has {} buttons, but {} names passed".format(len(self.__buttons), len(buttons)))
+        self.__names = list(buttons)
+        for button, name in zip(self.__buttons, buttons):
+            button.get_instance().setText(name)
+        return self
+
+    @classmethod
+    def pooled(cls, title: str, buttons: [str], message: str = None, parent=None):
+        """
+        Get dialog window from pool. Window is returned to pool after close
+        :param title: window title
+        :param buttons: buttons names
+        :param message: message
+        :param parent: parent Qt widget
+        :return: window
+        :rtype: DialogWindow
+        """
+        window = _windows_pool.acquire(cls.__pool_key(len(buttons), message is not None, parent),
+                                       lambda: cls(title, buttons, message, parent), parent)
+        window.set_title(title).set_buttons(buttons)
+        if message is not None:
+            window.set_message(message)
+        return window
+
+    @classmethod
+    def prewarm(cls, buttons_num: int, num: int = 1, has_message: bool = True, parent=None):
+        """
+        Build dialog windows for pool beforehand
+        :param buttons_num: number of buttons
+        :param num: number of windows
+        :param has_message: is windows with message
+        :param parent: parent Qt widget
+        """
+        _windows_pool.prewarm(cls.__pool_key(buttons_num, has_message, parent),
+                              lambda: cls("", [""] * buttons_num, "" if has_message else None, parent), num, parent)
+
+    @classmethod
+    def __pool_key(cls, buttons_num: int, has_message: bool, parent):
+        return cls, buttons_num, has_message, parent
+
+    def __on_button(self, idx: int):
+        self.__choose = self.__names[idx]
+        self.close()
+
+
+class ProgressToken:
+    """
+    Token, that connects background task with progress window: task reports progress and checks cancellation by it.
+    Progress is only written to shared values, that are polled by window, so reporting is cheap.
+    Token for process task is based on shared memory and may be passed to another process
+    """
+
+    STATUS_SIZE = 256
+
+    def __init__(self, is_multiprocess: bool = False):
+        self.__is_multiprocess = is_multiprocess
+        if is_multiprocess:
+            self.__cancel_event = multiprocessing.Event()
+            self.__values = multiprocessing.Array('q', [-1, -1], lock=False)
+            self.__statuses = [multiprocessing.Array('c', self.STATUS_SIZE, lock=False) for _ in range(2)]
+        else:
+            self.__cancel_event = threading.Event()
+            self.__values = [-1, -1]
+            self.__statuses = ["", ""]
+
+    def set_value(self, value: int, status: str = ""):
+        """
+        Report progress of task
+        """
+        self.__set(0, value, status)
+
+    def set_overall_value(self, value: int, status: str = ""):
+        """
+        Report overall progress of task (for DoubleProgressWindow)
+        """
+        self.__set(1, value, status)
+
+    def get_values(self):
+        """
+        Get reported progress values
+        :return: list of (value, status) for progress and overall progress. Value is -1 if it wasn't reported
+        """
+        return [(self.__values[i], self.__statuses[i].value.decode(errors='replace') if self.__is_multiprocess
+                 else self.__statuses[i]) for i in range(2)]
+
+    def cancel(self):
+        self.__cancel_event.set()
+
+    def is_cancelled(self):
+        """
+        Is task cancelled by user. Task should check it periodically and return as soon as possible if it's True
+        """
+        return self.__cancel_event.is_set()
+
+    def __set(self, idx: int, value: int, status: str):
+        if self.__is_multiprocess:
+            self.__statuses[idx].value = status.encode()[:self.STATUS_SIZE - 1]
+        else:
+            self.__statuses[idx] = status
+        self.__values[idx] = value
+
+
+def _run_process_task(task: callable, token: ProgressToken, args: tuple, kwargs: dict, result_queue):
+    try:
+        result_queue.put((task(token, *args, **kwargs), None))
+    except Exception as err:
+        result_queue.put((None, err))
+
+
+_run_thread_task = _run_process_task
+
+
+class TaskRunner:
+    """
+    TaskRunner runs task in background thread or process while progress window is shown. Task is called as
+    task(token, *args, **kwargs), where token is ProgressToken. Progress from token is shown in window, window closing
+    (by Cancel button too) cancels token. Window is closed when task is finished
+    """
+
+    def __init__(self, window: "ModalWindow", update_rate: int = 30, cancel_timeout: float = 5):
+        """
+        TaskRunner constructor
+        :param window: window, that shows progress. Must have set_value method and may have set_overall_value method
+        :param update_rate: number of progress polls per second
+        :param cancel_timeout: time in seconds to wait cancelled task. Process task is terminated after it, thread task
+        is left to finish in background and it's result is ignored
+        """
+        self.__window = window
+        self.__update_rate = update_rate
+        self.__cancel_timeout = cancel_timeout
+        self.__token = None
+        self.__is_finished = True
+        self.__outcome = None
+        self.__shown_values = None
+        window.add_on_close_callback(lambda event: self.__token.cancel() if not self.__is_finished else None)
+
+    def run(self, task: callable, args: tuple = (), kwargs: dict = None, use_process: bool = False):
+        """
+        Run task and show window until task is finished or cancelled
+        :param task: callable task(token, *args, **kwargs). Must be picklable for process
+        :param args: task arguments
+        :param kwargs: task keyword arguments
+        :param use_process: is need to run task in separate process
+        :return: task result. Exception, that raised by task, is raised again
+        """
+        kwargs = {} if kwargs is None else kwargs
+        self.__token = ProgressToken(use_process)
+        self.__is_finished, self.__outcome, self.__shown_values = False, None, None
+
+        if use_process:
+            result_queue = multiprocessing.Queue()
+            worker = multiprocessing.Process(target=_run_process_task,
+                                             args=(task, self.__token, args, kwargs, result_queue), daemon=True)
+        else:
+            # thread puts outcome to it's own queue, so thread, that was left after cancel, can't affect next run
+            result_queue = queue.Queue()
+            worker = threading.Thread(target=_run_thread_task, args=(task, self.__token, args, kwargs, result_queue),
+                                      daemon=True)
+        worker.start()
+
+        timer = QTimer()
+        timer.timeout.connect(lambda: self.__poll(worker, result_queue))
+        timer.start(max(int(1000 / self.__update_rate), 1))
+        self.__window.show()
+        timer.stop()
+
+        if not self.__is_finished:
+            self.__token.cancel()
+            self.__wait(worker, result_queue)
+        self.__is_finished = True
+
+        result, error = self.__outcome if self.__outcome is not None else (None, None)
+        if error is not None:
+            raise error
+        return result
+
+    def __poll(self, worker, result_queue):
+        values = self.__token.get_values()
+        if values != self.__shown_values:
+            self.__shown_values = values
+            (value, status), (overall_value, overall_status) = values
+            if value >= 0:
+                self.__window.set_value(value, status)
+            if overall_value >= 0 and hasattr(self.__window, 'set_overall_value'):
+                self.__window.set_overall_value(overall_value, overall_status)
+
+        try:
+            self.__outcome = result_queue.get_nowait()
+        except queue.Empty:
+            if worker.is_alive():
+                return
+            worker.join()
+            # worker may put outcome and exit between get and is_alive checks. Outcome of process may reach queue
+            # a bit later than process exit, so it's waited shortly
+            try:
+                self.__outcome = result_queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        worker.join()
+
+        self.__is_finished = True
+        self.__window.close()
+
+    def __wait(self, worker, result_queue):
+        try:
+            self.__outcome = result_queue.get(timeout=self.__cancel_timeout)
+        except queue.Empty:
+            if isinstance(worker, threading.Thread):
+                # thread can't be terminated: it's daemon, so it doesn't block application exit
+                return
+            worker.terminate()
+        worker.join()
 
 
 class ProgressWindow(ModalWindow):
-    def __init__(self, title: str):
+    def __init__(self, title: str, update_rate: int = 30):
+        """
+        ProgressWindow constructor
+        :param title: window title
+        :param update_rate: maximum number of progress updates per second. set_value may be called from any thread and
+        as often as needed: only the latest value is shown
+        """
         super().__init__(title)
 
-        self.__progress_bar = self.add_widget(ProgressBar())
+        self.__progress_bar = self.add_widget(ProgressBar(update_rate))
         self.__btn = self.add_widget(Button("Cancel")).set_on_click_callback(lambda: self.close())
+        self.__runner = TaskRunner(self, update_rate)
 
     def show(self):
         super().show()
 
+    def run(self, task: callable, *args, use_process: bool = False, **kwargs):
+        """
+        Run task in background thread (or process) and show this window until task is finished.
+        Task is called as task(token, *args, **kwargs), where token is ProgressToken: task reports progress by
+        token.set_value and should check token.is_cancelled periodically. Cancel button cancels token
+        :param task: task callable. Must be picklable if use_process is True
+        :param use_process: is need to run task in separate process
+        :return: task result. Exception, that raised by task, is raised again
+        """
+        return self.__runner.run(task, args, kwargs, use_process)
+
     def set_value(self, value: int, status: str = ""):
         self.__progress_bar.set_value(value, status)
 
+    def set_maximum(self, maximum: int):
+        self.__progress_bar.set_maximum(maximum)
+        return self
+
 
 class DoubleProgressWindow(ModalWindow):
-    def __init__(self, title: str):
+    def __init__(self, title: str, update_rate: int = 30):
+        """
+        DoubleProgressWindow constructor
+        :param title: window title
+        :param update_rate: maximum number of progress updates per second. set_value and set_overall_value may be
+        called from any thread and as often as needed: only the latest values are shown
+        """
         super().__init__(title)
 
-        self.__overall_pbar = self.add_widget(ProgressBar())
-        self.__pbar = self.add_widget(ProgressBar())
+        self.__overall_pbar = self.add_widget(ProgressBar(update_rate))
+        self.__pbar = self.add_widget(ProgressBar(update_rate))
         self.__btn = self.add_widget(Button("Cancel")).set_on_click_callback(lambda: self.close())
+        self.__runner = TaskRunner(self, update_rate)
+
+        self.__update_rate = update_rate
+        self.__board = None
+        self.__board_timer = None
+        self.__workers_pbars = []
 
     def show(self):
         super().show()
 
+    def run(self, task: callable, *args, use_process: bool = False, **kwargs):
+        """
+        Run task in background thread (or process) and show this window until task is finished.
+        Task is called as task(token, *args, **kwargs), where token is ProgressToken: task reports progress by
+        token.set_value and token.set_overall_value and should check token.is_cancelled periodically.
+        Cancel button cancels token
+        :param task: task callable. Must be picklable if use_process is True
+        :param use_process: is need to run task in separate process
+        :return: task result. Exception, that raised by task, is raised again
+        """
+        return self.__runner.run(task, args, kwargs, use_process)
+
     def set_overall_value(self, value: int, status: str = ""):
-        self.__pbar.set_value(value, status)
+        self.__overall_pbar.set_value(value, status)
 
     def set_value(self, value: int, status: str = ""):
-        self.__overall_pbar.set_value(value, status)
+        self.__pbar.set_value(value, status)
+
+    def attach_progress_board(self, board: ProgressBoard, is_show_workers: bool = True):
+        """
+        Show progress from ProgressBoard, that is filled by worker processes. Board is polled with window update rate:
+        overall progress shows sum of all slots, and progress bar is added for every slot. Must be called before show
+        :param board: progress board
+        :param is_show_workers: is need to show progress bar for every board slot
+        :return: self instance
+        """
+        self.__board = board
+        if is_show_workers:
+            self.__workers_pbars = [self.add_widget(ProgressBar(), need_stretch=False)
+                                    for _ in range(board.get_slots_num())]
+        if self.__board_timer is None:
+            self.__board_timer = QTimer(self._instance)
+            self.__board_timer.timeout.connect(self.__poll_progress_board)
+        self.__board_timer.start(max(int(1000 / self.__update_rate), 1))
+        return self
+
+    def detach_progress_board(self):
+        """
+        Stop polling of ProgressBoard
+        :return: self instance
+        """
+        if self.__board_timer is not None:
+            self.__board_timer.stop()
+        self.__board = None
+        return self
+
+    def __poll_progress_board(self):
+        slots = self.__board.get_all()
+        done, total = sum(s[0] for s in slots), sum(s[1] for s in slots)
+        self.set_overall_value(self.__get_percent(done, total), "{:g} / {:g}".format(done, total))
+        for i, (pbar, (done, total)) in enumerate(zip(self.__workers_pbars, slots)):
+            pbar.set_value(self.__get_percent(done, total), "Worker {}: {:g} / {:g}".format(i, done, total))
+
+    @staticmethod
+    def __get_percent(done: float, total: float):
+        return int(100 * done / total) if total > 0 else 0
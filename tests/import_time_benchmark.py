@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+
+RUNS_NUM = 5
+MAX_IMPORT_TIME = 1.0  # seconds
+
+# modules, that must not be imported by applications without ImageLayout, Table and OpenGLWidget
+HEAVY_MODULES = ['numpy', 'PySide2.QtOpenGL', 'PySide2Wrapper.image_layout', 'PySide2Wrapper.table',
+                 'PySide2Wrapper.opengl']
+
+CASES = {
+    'package': "import PySide2Wrapper",
+    'progress window': "import PySide2Wrapper; PySide2Wrapper.ProgressWindow",
+    'image layout': "import PySide2Wrapper; PySide2Wrapper.ImageLayout",
+}
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(code: str):
+    """
+    Run code in new interpreter with -X importtime
+    :return: cumulative import time in seconds and dict of imported modules with its cumulative times
+    """
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=root, stderr=subprocess.PIPE,
+                         universal_newlines=True, check=True)
+    modules, total = {}, 0
+    for line in res.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = int(cumulative) / 1e6
+        # nested imports are indented, so only top level imports are summed
+        if len(name) - len(name.lstrip()) == 1:
+            total += int(cumulative) / 1e6
+    return total, modules
+
+
+for case, code in CASES.items():
+    times = []
+    for _ in range(RUNS_NUM):
+        total, modules = measure(code)
+        times.append(total)
+
+    slowest = sorted(modules.items(), key=lambda m: m[1], reverse=True)[:5]
+    print("{}: {:.1f} ms (min of {} runs), slowest: {}".format(case, min(times) * 1e3, RUNS_NUM,
+                                                              ", ".join("{} {:.1f} ms".format(n, t * 1e3)
+                                                                        for n, t in slowest)))
+
+    if case != 'image layout':
+        imported = [m for m in HEAVY_MODULES if m in modules]
+        assert len(imported) == 0, "Heavy modules imported by '{}': {}".format(case, imported)
+        assert min(times) < MAX_IMPORT_TIME, "Import time of '{}' is too big".format(case)
@@ -0,0 +1,27 @@
+import time
+
+from PySide2Wrapper.app import Application
+from PySide2Wrapper.widget import ListWidget
+
+CALLS_NUM = 1000
+
+app = Application()
+
+for items_num in [1000, 10000, 50000, 200000]:
+    list_widget = ListWidget()
+    callback_calls = []
+    list_widget.set_value_changed_callback(lambda idx: callback_calls.append(idx))
+
+    start = time.perf_counter()
+    list_widget.add_items(["item {}".format(i) for i in range(items_num)])
+    fill_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(CALLS_NUM):
+        list_widget.set_value(items_num - 1 - i % 2)
+        list_widget.get_value()
+    select_time = (time.perf_counter() - start) / CALLS_NUM
+
+    print("{} items: fill {:.1f} ms, selection with callback {:.1f} us".format(items_num, fill_time * 1e3,
+                                                                              select_time * 1e6))
+    assert len(callback_calls) == CALLS_NUM